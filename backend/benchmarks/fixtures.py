@@ -0,0 +1,141 @@
+from typing import List, Optional
+import io
+import random
+import textwrap
+
+from services.document_parser import SKILLS_KEYWORDS
+
+LINES_PER_PAGE = 55
+LINE_WIDTH = 90
+
+# Resume sizes span a one-page resume to a 30-page CV; skills counts are skill mentions,
+# drawn from the shipped taxonomy (about a hundred surface forms) with repetition.
+SIZES = {
+    "small": {"pages": 1, "skills": 10},
+    "medium": {"pages": 5, "skills": 100},
+    "large": {"pages": 30, "skills": 1000}
+}
+
+# Synthetic taxonomies far larger than the shipped one, to show how matching scales with the
+# number of distinct skills rather than mentions: each is matched against a 30-page resume
+# mentioning 1000 different skills from it
+TAXONOMY_SIZES = {"1k": 1000, "10k": 10000, "50k": 50000}
+TAXONOMY_MENTIONS = 1000
+
+_FILLER = [
+    "delivered", "designed", "owned", "migrated", "improved", "the", "platform", "service", "team", "reliability",
+    "customers", "pipeline", "latency", "release", "stakeholders", "roadmap", "features", "quality", "across",
+    "reduced", "costs", "by", "with", "for", "production", "internal", "tooling", "weekly", "mentored", "engineers"
+]
+
+
+def _body_tokens(rng: random.Random, skills: List[str], words: int) -> List[str]:
+    tokens = [rng.choice(_FILLER) for _ in range(words)]
+    # Spread skill mentions evenly through the filler so matching sees realistic gaps
+    for index, skill in enumerate(skills):
+        position = (index * len(tokens)) // max(len(skills), 1)
+        tokens.insert(position + index, skill)
+    return tokens
+
+
+
+def make_resume(pages: int, skills: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    mentions = [SKILLS_KEYWORDS[rng.randrange(len(SKILLS_KEYWORDS))] for _ in range(skills)]
+    words = pages * LINES_PER_PAGE * (LINE_WIDTH // 8)
+    body = " ".join(_body_tokens(rng, mentions, max(words - 40, 0)))
+    header = (
+        "Jane Doe - Senior Software Engineer\n"
+        f"Summary: {rng.randint(3, 15)}+ years of experience building backend systems.\n"
+        f"Experience: {rng.randint(2, 8)} years of experience leading teams.\n"
+    )
+    return header + textwrap.fill(body, LINE_WIDTH)
+
+
+
+def make_job_description(skills: int, seed: int = 11) -> str:
+    rng = random.Random(seed)
+    required = [SKILLS_KEYWORDS[rng.randrange(len(SKILLS_KEYWORDS))] for _ in range(min(skills, 40))]
+    lines = [
+        "Senior Backend Engineer",
+        f"We are looking for an engineer with {rng.randint(3, 8)}+ years of experience.",
+        "Requirements:"
+    ]
+    lines.extend(f"- Hands-on experience with {skill}" for skill in required)
+    lines.append("Nice to have: " + ", ".join(rng.sample(SKILLS_KEYWORDS, 10)))
+    return "\n".join(lines)
+
+
+
+def make_taxonomy_keywords(count: int, seed: int = 5) -> List[str]:
+    # Unique names shaped like real ones: single words, multi-word names sharing prefixes and
+    # names ending in symbols ('.js', '++', '#'), which exercise the trie and the lookarounds
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "zen", "tor", "ra", "vex", "qu", "sta", "pli", "dro", "ne", "fi", "gra", "on"]
+    suffixes = ["", "", "", ".js", "++", "#", " cloud", " db", " ops", " ml"]
+    keywords = set()
+    while len(keywords) < count:
+        stem = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        keywords.add(stem + rng.choice(suffixes))
+    return sorted(keywords)
+
+
+
+def make_taxonomy_resume(keywords: List[str], mentions: int = TAXONOMY_MENTIONS, pages: int = 30, seed: int = 13) -> str:
+    rng = random.Random(seed)
+    mentioned = rng.sample(keywords, min(mentions, len(keywords)))
+    words = pages * LINES_PER_PAGE * (LINE_WIDTH // 8)
+    return textwrap.fill(" ".join(_body_tokens(rng, mentioned, max(words - len(mentioned), 0))), LINE_WIDTH)
+
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+
+def make_pdf(text: str) -> bytes:
+    # A hand-written PDF 1.4: one Helvetica text stream per page, no external dependency
+    lines = text.split("\n")
+    pages = [lines[start:start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    objects: List[Optional[bytes]] = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in page_lines) + " ET"
+        stream = content.encode("latin-1", errors="replace")
+        objects.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode()
+        )
+        page_ids.append(len(objects))
+
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{pid} 0 R' for pid in page_ids)}] /Count {len(page_ids)} >>".encode()
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    xref_offset = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode())
+    output.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+    return output.getvalue()
+
+
+
+def make_docx(text: str) -> bytes:
+    import docx
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
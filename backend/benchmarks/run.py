@@ -0,0 +1,217 @@
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Benchmarks never reach the network: the Hugging Face stack may only use models already on disk
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+from services.document_parser import (
+    extract_skills, extract_experience_years, parse_pdf, parse_docx, shutdown_parse_pool, _compile_skill_pattern
+)
+from services.analysis_service import AnalysisService
+from services.embedding_cache import EmbeddingCache
+from services.llm_cache import LLMResponseCache
+from services.worker_pool import WorkerPool
+
+from .fixtures import (
+    SIZES, TAXONOMY_SIZES, make_resume, make_job_description, make_pdf, make_docx, make_taxonomy_keywords,
+    make_taxonomy_resume
+)
+from .stubs import StubDeepseekService
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def measure(fn: Callable[[], Any], min_seconds: float, min_iterations: int) -> Dict[str, Any]:
+    fn()  # warm-up: imports, lazy models and regex compilation stay out of the numbers
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_iterations or time.perf_counter() - started < min_seconds:
+        call_started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - call_started)
+
+    # Peak memory comes from one separate traced call; tracing slows everything down
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "iterations": len(timings),
+        "ops_per_sec": round(len(timings) / sum(timings), 2),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 4),
+        "p50_ms": round(_percentile(timings, 50) * 1000, 4),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 4),
+        "p99_ms": round(_percentile(timings, 99) * 1000, 4),
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    index = (len(sorted_values) - 1) * percentile / 100
+    lower = int(index)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (index - lower)
+
+
+
+def build_service(semantic: bool) -> AnalysisService:
+    # Caches are disabled so every iteration measures the real work rather than a lookup
+    service = AnalysisService(deepseek_service=StubDeepseekService(), worker_pool=WorkerPool(kind="thread", max_workers=1, max_queue=4))
+    service.embedding_cache = EmbeddingCache(max_entries=0)
+    service.llm_cache = LLMResponseCache(max_entries=0)
+    service.llm_deadline_seconds = 0
+    if not semantic:
+        service._semantic_model_state = "unavailable"
+    return service
+
+
+
+def build_cases(semantic: bool) -> Dict[str, Callable[[], Any]]:
+    service = build_service(semantic)
+    loop = asyncio.new_event_loop()
+    cases: Dict[str, Callable[[], Any]] = {}
+
+    for size, spec in SIZES.items():
+        resume = make_resume(spec["pages"], spec["skills"])
+        jd = make_job_description(spec["skills"])
+        resume_skills = extract_skills(resume)
+        jd_skills = extract_skills(jd)
+
+        cases[f"extract_skills[{size}]"] = lambda text=resume: extract_skills(text)
+        cases[f"extract_experience_years[{size}]"] = lambda text=resume: extract_experience_years(text)
+        cases[f"calculate_match_score[{size}]"] = (
+            lambda r=resume, j=jd, rs=resume_skills, js=jd_skills: service._calculate_match_score(r, j, rs, js)
+        )
+        cases[f"analyze[{size}]"] = (
+            lambda r=resume, j=jd: loop.run_until_complete(service.analyze(r, j, bypass_cache=True))
+        )
+
+        try:
+            pdf = make_pdf(resume)
+            parse_pdf(pdf)
+            cases[f"parse_pdf[{size}]"] = lambda content=pdf: parse_pdf(content)
+        except ImportError as e:
+            print(f"Warning: Skipping parse_pdf benchmarks: {e}")
+
+        try:
+            document = make_docx(resume)
+            cases[f"parse_docx[{size}]"] = lambda content=document: parse_docx(content)
+        except ImportError as e:
+            print(f"Warning: Skipping parse_docx benchmarks: {e}")
+
+    # The same matcher compiled from synthetic taxonomies of 1k-50k distinct skills
+    for size, count in TAXONOMY_SIZES.items():
+        keywords = make_taxonomy_keywords(count)
+        pattern = _compile_skill_pattern(keywords)
+        resume = make_taxonomy_resume(keywords)
+        cases[f"match_skills[{size}_taxonomy]"] = lambda p=pattern, text=resume: [match.group(0) for match in p.finditer(text)]
+
+    return cases
+
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    semantic = not args.no_semantic
+    cases = build_cases(semantic)
+    results = {}
+    try:
+        for name, fn in cases.items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(fn, args.min_seconds, args.min_iterations)
+            result = results[name]
+            print(f"{name:<40} {result['ops_per_sec']:>12.2f} ops/s  p50 {result['p50_ms']:>10.3f} ms  "
+                  f"p95 {result['p95_ms']:>10.3f} ms  peak {result['peak_memory_kb']:>10.1f} KB")
+    finally:
+        shutdown_parse_pool()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "semantic": semantic
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+    return report
+
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        # Latency and memory regress upwards; small absolute changes are noise, not regressions
+        for metric, floor in (("p50_ms", 0.05), ("p95_ms", 0.05), ("peak_memory_kb", 64)):
+            if now[metric] > before[metric] * (1 + threshold) and now[metric] - before[metric] > floor:
+                regressions.append({
+                    "benchmark": name,
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "current": now[metric],
+                    "change": round(now[metric] / before[metric] - 1, 3) if before[metric] else None
+                })
+    return regressions
+
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for parsing, skill extraction and match scoring")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the suite and write a JSON report")
+    run_parser.add_argument("--output", default=DEFAULT_BASELINE_PATH)
+    run_parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    run_parser.add_argument("--min-seconds", type=float, default=1.0)
+    run_parser.add_argument("--min-iterations", type=int, default=5)
+    run_parser.add_argument("--no-semantic", action="store_true", help="Score without the sentence-transformer model")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare a report against a baseline and flag regressions")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown, e.g. 0.15 for 15%%")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run(args)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    with open(args.current, encoding="utf-8") as handle:
+        current = json.load(handle)
+    if baseline["meta"].get("semantic") != current["meta"].get("semantic"):
+        print("Warning: Baseline and current report were run with different semantic settings")
+
+    regressions = compare(baseline, current, args.threshold)
+    for regression in regressions:
+        change = f" ({regression['change']:+.1%})" if regression["change"] is not None else ""
+        print(f"REGRESSION {regression['benchmark']} {regression['metric']}: {regression['baseline']} -> {regression['current']}{change}")
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
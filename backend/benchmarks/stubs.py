@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+
+_CANNED_ANALYSIS = {
+    "fit_score": 72,
+    "fit_level": "Good",
+    "summary": "Solid backend experience with most of the required stack. A few platform gaps remain.",
+    "key_strengths": [{"strength": "python", "evidence": "Several years of production services"}],
+    "critical_gaps": [{"gap": "kubernetes", "priority": "High", "solution": "Deploy a side project to a managed cluster"}],
+    "learning_path": [{"step": 1, "skill": "kubernetes", "timeline": "4 weeks"}],
+    "quick_wins": ["Add measurable outcomes to recent roles"],
+    "readiness_percentage": 70,
+    "next_steps": ["Apply after finishing the learning path"]
+}
+
+
+class StubDeepseekService:
+    # Same surface as DeepseekService, answering from canned data so benchmarks never touch the network
+    def __init__(self, latency_seconds: float = 0.0):
+        self.api_key = "benchmark"
+        self.model = "benchmark-stub"
+        self.temperature = 0.7
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+
+
+    async def start(self):
+        pass
+
+
+
+    async def close(self):
+        pass
+
+
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {"requests": self.calls}
+
+
+
+    async def chat(self, messages: List[Dict[str, str]], context: Optional[Dict[str, str]] = None) -> str:
+        return await self.complete(messages, context)
+
+
+
+    async def complete(self, messages: List[Dict[str, str]], context: Optional[Dict[str, str]] = None) -> str:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return "```json\n" + json.dumps(_CANNED_ANALYSIS) + "\n```"
+
+
+
+    def system_message(self, context: Optional[Dict[str, str]]) -> str:
+        return "You are a career advisor."
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import os
@@ -7,12 +8,28 @@ from dotenv import load_dotenv
 import json
 from datetime import datetime
 import aiofiles
+import asyncio
+import uuid
+import time
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
 
-from services.document_parser import parse_resume, parse_job_description
+# Before the services are imported: several read their settings into module constants at import time
+load_dotenv()
+
+from services.document_parser import (
+    parse_document_file_async, parse_cache, shutdown_parse_pool, DocumentTooLargeError, MAX_DOCUMENT_BYTES,
+    list_archive_members, parse_archive_member, get_parse_executor, discard_parse_pool
+)
+from services.upload_spool import spool_upload, declared_size_exceeds
 from services.analysis_service import AnalysisService
 from services.deepseek_service import DeepseekService
-
-load_dotenv()
+from services.worker_pool import PoolSaturatedError
+from services.job_index import JobIndex
+from services.session_store import create_session_store
+from services.context_manager import ConversationContextManager
+from services.single_flight import SingleFlight
+from services.metrics import REGISTRY, begin_request_timings, end_request_timings, server_timing_header
 
 app = FastAPI(title="Career Compass API", version="1.0.0")
 
@@ -24,13 +41,113 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-analysis_service = AnalysisService()
 deepseek_service = DeepseekService()
+analysis_service = AnalysisService(deepseek_service=deepseek_service)
+job_index = JobIndex.from_env()
+analysis_flights = SingleFlight()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "careercompass_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    token = begin_request_timings()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        timings = end_request_timings(token)
+    elapsed = time.perf_counter() - started
+
+    # Route templates, not raw paths, keep label cardinality bounded
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(elapsed, method=request.method, route=getattr(route, "path", "unmatched"), status=response.status_code)
+    if timings:
+        response.headers["Server-Timing"] = f"{server_timing_header(timings)}, total;dur={elapsed * 1000:.1f}"
+    return response
+
+
+
+BULK_MAX_ARCHIVE_BYTES = int(os.getenv("BULK_MAX_ARCHIVE_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_LIMITS = {
+    "/api/upload-resume": MAX_DOCUMENT_BYTES,
+    "/api/upload-jd": MAX_DOCUMENT_BYTES,
+    "/api/upload-resumes/bulk": BULK_MAX_ARCHIVE_BYTES
+}
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    # Runs before the multipart body is read, so a declared oversize upload is never received
+    limit = UPLOAD_LIMITS.get(request.url.path)
+    if limit is not None and declared_size_exceeds(request.headers.get("content-length"), limit):
+        return JSONResponse(status_code=413, content={"detail": f"Upload is larger than the {limit / (1024 * 1024):g} MB limit"})
+    return await call_next(request)
+
+
+
+def _collect_service_metrics():
+    pool = analysis_service.worker_pool.stats()
+    embedding = analysis_service.embedding_cache.stats()
+    llm = analysis_service.llm_cache.stats()
+    parse = parse_cache.stats()
+    session_stats = sessions.stats()
+    flights = analysis_flights.stats()
+    batcher = analysis_service.embedding_batcher.stats()
+    families = [
+        ("careercompass_analysis_pool_in_flight", "gauge", "Analysis jobs running or queued in the worker pool", [({}, pool["in_flight"])]),
+        ("careercompass_analysis_pool_rejected_total", "counter", "Analysis jobs rejected because the pool was saturated", [({}, pool["rejected"])]),
+        ("careercompass_embedding_batch_queue_depth", "gauge", "Encode requests waiting for the embedding batcher", [({}, batcher["queue_depth"])]),
+        ("careercompass_embedding_batch_max_size", "gauge", "Configured embedding micro-batch size", [({}, batcher["max_batch_size"])]),
+        ("careercompass_embedding_batch_max_wait_seconds", "gauge", "Configured embedding micro-batch wait", [({}, batcher["max_wait_ms"] / 1000)]),
+        ("careercompass_analysis_coalesced_total", "counter", "Analysis requests that joined an identical in-flight run", [({}, flights["coalesced"])]),
+        ("careercompass_cache_hits_total", "counter", "Cache hits by cache", [
+            ({"cache": "embedding"}, embedding["memory_hits"] + embedding["disk_hits"]),
+            ({"cache": "llm"}, llm["hits"]),
+            ({"cache": "parse"}, parse["hits"])
+        ]),
+        ("careercompass_cache_misses_total", "counter", "Cache misses by cache", [
+            ({"cache": "embedding"}, embedding["misses"]),
+            ({"cache": "llm"}, llm["misses"]),
+            ({"cache": "parse"}, parse["misses"])
+        ])
+    ]
+    # Backends that cannot count cheaply (Redis) leave the gauge out rather than report zero
+    if "sessions" in session_stats:
+        families.append(("careercompass_sessions", "gauge", "Chat sessions currently stored", [({}, session_stats["sessions"])]))
+    return families
+
+
+REGISTRY.add_collector(_collect_service_metrics)
 
 class AnalysisRequest(BaseModel):
     resume_text: str
     job_description_text: str
 
+class BatchJobDescription(BaseModel):
+    job_description_text: str
+    job_id: Optional[str] = None
+    include_ai_analysis: bool = False
+
+class BatchAnalysisRequest(BaseModel):
+    resume_text: str
+    job_descriptions: List[BatchJobDescription]
+
+class JobPosting(BaseModel):
+    job_description_text: str
+    job_id: Optional[str] = None
+    title: Optional[str] = None
+
+class JobsAddRequest(BaseModel):
+    jobs: List[JobPosting]
+
+class JobSearchRequest(BaseModel):
+    resume_text: str
+    top_k: int = 10
+    min_skill_overlap: int = 1
+
 class ChatMessage(BaseModel):
     message: str
     session_id: str
@@ -44,7 +161,46 @@ class AnalysisResponse(BaseModel):
     recommendations: List[str]
     actionable_tip: str
 
-sessions = {}
+sessions = create_session_store()
+context_manager = ConversationContextManager.from_env(sessions, deepseek_service)
+
+
+
+@app.on_event("startup")
+async def startup():
+    await deepseek_service.start()
+    
+    # Load models in the background so the process answers health checks immediately
+    if os.getenv("MODEL_WARMUP", "true").lower() in ("1", "true", "yes"):
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(analysis_service.warm_up))
+    
+    app.state.job_index_flush_task = asyncio.create_task(_flush_job_index_periodically())
+    app.state.session_sweeper_task = asyncio.create_task(
+        sessions.run_sweeper(float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60")))
+    )
+
+
+
+async def _flush_job_index_periodically():
+    interval = float(os.getenv("JOB_INDEX_FLUSH_INTERVAL_SECONDS", "30"))
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(job_index.flush)
+        except Exception as e:
+            print(f"Warning: Could not flush job index: {e}")
+
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await deepseek_service.close()
+    analysis_service.close()
+    app.state.job_index_flush_task.cancel()
+    app.state.session_sweeper_task.cancel()
+    sessions.close()
+    job_index.flush()
+    shutdown_parse_pool()
 
 
 
@@ -52,35 +208,209 @@ sessions = {}
 async def root():
     return {"message": "Career Compass API", "version": "1.0.0"}
 
+@app.get("/metrics")
+async def metrics():
+    # Collectors query the session backend, so rendering stays off the event loop
+    return PlainTextResponse(await asyncio.to_thread(REGISTRY.render), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+async def ready():
+    readiness = analysis_service.readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+
+
 @app.post("/api/analyze")
-async def analyze_resume_jd(request: AnalysisRequest):
+async def analyze_resume_jd(request: AnalysisRequest, http_request: Request):
     try:
-        analysis_result = await analysis_service.analyze(
+        bypass_cache = _cache_bypass_requested(http_request)
+        # Identical payloads already being analysed (duplicate tabs, retries) share one run
+        flight_key = SingleFlight.make_key(request.resume_text, request.job_description_text, bypass_cache=bypass_cache)
+        analysis_result = await analysis_flights.run(flight_key, lambda: analysis_service.analyze(
             resume_text=request.resume_text,
-            job_description_text=request.job_description_text
-        )
+            job_description_text=request.job_description_text,
+            bypass_cache=bypass_cache
+        ))
         
         return {
             "success": True,
             "data": analysis_result,
             "timestamp": datetime.now().isoformat()
         }
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
+def _cache_bypass_requested(http_request: Request) -> bool:
+    if http_request.headers.get("x-cache-bypass", "").lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in http_request.headers.get("cache-control", "").lower()
+
+
+
+@app.post("/api/analyze/batch")
+async def analyze_resume_batch(request: BatchAnalysisRequest, http_request: Request):
+    if not request.job_descriptions:
+        raise HTTPException(status_code=400, detail="At least one job description is required")
+    
+    try:
+        results = await analysis_service.analyze_many(
+            resume_text=request.resume_text,
+            jds=[jd.dict() for jd in request.job_descriptions],
+            bypass_cache=_cache_bypass_requested(http_request)
+        )
+        
+        return {
+            "success": True,
+            "data": results,
+            "count": len(results),
+            "timestamp": datetime.now().isoformat()
+        }
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return {
+        "success": True,
+        "embedding_cache": analysis_service.embedding_cache.stats(),
+        "llm_cache": analysis_service.llm_cache.stats(),
+        "parse_cache": parse_cache.stats(),
+        "analysis_single_flight": analysis_flights.stats()
+    }
+
+
+
+@app.get("/api/http/stats")
+async def http_stats():
+    return {
+        "success": True,
+        "openrouter_pool": deepseek_service.pool_stats()
+    }
+
+
+
+@app.get("/api/pool/stats")
+async def pool_stats():
+    return {
+        "success": True,
+        "analysis_pool": analysis_service.worker_pool.stats(),
+        "embedding_batcher": analysis_service.embedding_batcher.stats()
+    }
+
+
+
+@app.post("/api/jobs")
+async def add_jobs(request: JobsAddRequest):
+    if not request.jobs:
+        raise HTTPException(status_code=400, detail="At least one job is required")
+    
+    try:
+        prepared = await analysis_service.prepare_job_documents([job.job_description_text for job in request.jobs])
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    def add_to_index() -> List[str]:
+        job_ids = []
+        for job, embedding, skills in zip(request.jobs, prepared["embeddings"], prepared["skills"]):
+            job_id = job.job_id or uuid.uuid4().hex
+            job_index.add(job_id, job.title, embedding, skills, excerpt=job.job_description_text[:300])
+            job_ids.append(job_id)
+        return job_ids
+    
+    # Index calls share a lock with threaded searches, so they stay off the event loop
+    job_ids = await asyncio.to_thread(add_to_index)
+    
+    return {
+        "success": True,
+        "job_ids": job_ids,
+        "index": await asyncio.to_thread(job_index.stats)
+    }
+
+
+
+@app.get("/api/jobs")
+async def job_index_stats():
+    return {
+        "success": True,
+        "index": await asyncio.to_thread(job_index.stats)
+    }
+
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_index.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "success": True,
+        "job": job
+    }
+
+
+
+@app.delete("/api/jobs/{job_id}")
+async def remove_job(job_id: str):
+    if not await asyncio.to_thread(job_index.remove, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "success": True,
+        "job_id": job_id
+    }
+
+
+
+@app.post("/api/jobs/search")
+async def search_jobs(request: JobSearchRequest):
+    try:
+        query = await analysis_service.prepare_resume_query(request.resume_text)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    results = await asyncio.to_thread(
+        job_index.search,
+        query["embedding"],
+        query["skills"],
+        max(1, request.top_k),
+        request.min_skill_overlap
+    )
+    
+    return {
+        "success": True,
+        "data": results,
+        "resume_skills": query["skills"],
+        "searched": job_index.size
+    }
+
+
+
 @app.post("/api/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     try:
-        content = await file.read()
-        text = parse_resume(content, file.filename)
+        with await spool_upload(file) as upload:
+            text = await parse_document_file_async(upload.path, file.filename, upload.sha256)
         
         return {
             "success": True,
             "text": text,
             "filename": file.filename
         }
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error parsing resume: {str(e)}")
 
@@ -89,50 +419,106 @@ async def upload_resume(file: UploadFile = File(...)):
 @app.post("/api/upload-jd")
 async def upload_jd(file: UploadFile = File(...)):
     try:
-        content = await file.read()
-        text = parse_job_description(content, file.filename)
+        with await spool_upload(file) as upload:
+            text = await parse_document_file_async(upload.path, file.filename, upload.sha256)
         
         return {
             "success": True,
             "text": text,
             "filename": file.filename
         }
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error parsing job description: {str(e)}")
 
 
 
+@app.post("/api/upload-resumes/bulk")
+async def upload_resumes_bulk(file: UploadFile = File(...), job_description_text: Optional[str] = Form(None)):
+    try:
+        upload = await spool_upload(file, max_bytes=BULK_MAX_ARCHIVE_BYTES)
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    try:
+        members = await asyncio.to_thread(
+            list_archive_members,
+            upload.path,
+            int(os.getenv("BULK_MAX_FILES", "500")),
+            int(os.getenv("BULK_MAX_UNCOMPRESSED_BYTES", str(1024 * 1024 * 1024)))
+        )
+    except DocumentTooLargeError as e:
+        upload.close()
+        raise HTTPException(status_code=413, detail=str(e))
+    except zipfile.BadZipFile:
+        upload.close()
+        raise HTTPException(status_code=400, detail="Uploaded file is not a valid ZIP archive")
+    
+    async def ndjson_stream():
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        scoring_slots = asyncio.Semaphore(analysis_service.worker_pool.max_workers)
+        
+        async def finish(member):
+            # One member failing, even by crashing its worker, becomes an error line; it never ends the stream
+            executor = get_parse_executor()
+            try:
+                result = await loop.run_in_executor(executor, parse_archive_member, upload.path, member)
+            except BrokenProcessPool as e:
+                discard_parse_pool(executor)
+                result = {"filename": member, "error": f"Parser worker crashed: {e}"}
+            except Exception as e:
+                result = {"filename": member, "error": str(e)}
+            if job_description_text and "text" in result:
+                async with scoring_slots:
+                    try:
+                        result["analysis"] = await analysis_service.score_pair(result["text"], job_description_text)
+                    except Exception as e:
+                        result["analysis_error"] = str(e)
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+        
+        # Members parse in parallel across the process pool; lines go out in completion order
+        tasks = [asyncio.ensure_future(finish(member)) for member in members]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield json.dumps(await task) + "\n"
+            yield json.dumps({
+                "done": True,
+                "files": len(members),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }) + "\n"
+        finally:
+            # Client gone or stream finished: cancelling a task also cancels its queued parse
+            for task in tasks:
+                task.cancel()
+            upload.close()
+    
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+
+
 @app.post("/api/chat")
 async def chat(message: ChatMessage):
     try:
         session_id = message.session_id
         
-        if session_id not in sessions:
-            sessions[session_id] = {
-                "messages": [],
-                "resume_text": None,
-                "job_description_text": None
-            }
+        # Session backends may block on disk or network, so they run off the event loop
+        await asyncio.to_thread(sessions.append_message, session_id, "user", message.message)
+        session = await asyncio.to_thread(sessions.get_or_create, session_id)
         
-        session = sessions[session_id]
-        
-        session["messages"].append({
-            "role": "user",
-            "content": message.message
+        messages, context = await context_manager.prepare(session_id, session, {
+            "resume": session.get("resume_text"),
+            "job_description": session.get("job_description_text")
         })
         
         response = await deepseek_service.chat(
-            messages=session["messages"],
-            context={
-                "resume": session.get("resume_text"),
-                "job_description": session.get("job_description_text")
-            }
+            messages=messages,
+            context=context
         )
         
-        session["messages"].append({
-            "role": "assistant",
-            "content": response
-        })
+        await asyncio.to_thread(sessions.append_message, session_id, "assistant", response)
         
         return {
             "success": True,
@@ -144,16 +530,57 @@ async def chat(message: ChatMessage):
 
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage, request: Request):
+    session_id = message.session_id
+    
+    await asyncio.to_thread(sessions.append_message, session_id, "user", message.message)
+    session = await asyncio.to_thread(sessions.get_or_create, session_id)
+    
+    async def event_stream():
+        tokens = []
+        try:
+            messages, context = await context_manager.prepare(session_id, session, {
+                "resume": session.get("resume_text"),
+                "job_description": session.get("job_description_text")
+            })
+            async for token in deepseek_service.chat_stream(
+                messages=messages,
+                context=context
+            ):
+                if await request.is_disconnected():
+                    # Closing the generator exits the upstream request context and cancels it
+                    return
+                tokens.append(token)
+                yield _sse_event("token", {"content": token})
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+            return
+        
+        response = "".join(tokens)
+        await asyncio.to_thread(sessions.append_message, session_id, "assistant", response)
+        
+        yield _sse_event("done", {"response": response, "session_id": session_id})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+
 @app.post("/api/session/create")
 async def create_session(resume_text: str = Form(...), job_description_text: str = Form(...)):
     try:
-        session_id = f"session_{datetime.now().timestamp()}"
-        sessions[session_id] = {
-            "messages": [],
-            "resume_text": resume_text,
-            "job_description_text": job_description_text,
-            "created_at": datetime.now().isoformat()
-        }
+        # Random suffix: ids must stay unique across worker processes sharing one backend
+        session_id = f"session_{datetime.now().timestamp()}_{uuid.uuid4().hex[:8]}"
+        await asyncio.to_thread(sessions.create, session_id, resume_text, job_description_text)
         
         return {
             "success": True,
@@ -166,12 +593,23 @@ async def create_session(resume_text: str = Form(...), job_description_text: str
 
 @app.get("/api/session/{session_id}")
 async def get_session(session_id: str):
-    if session_id not in sessions:
+    session = await asyncio.to_thread(sessions.get, session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
     return {
         "success": True,
-        "session": sessions[session_id]
+        "session": session
+    }
+
+
+
+@app.get("/api/session-store/stats")
+async def session_store_stats():
+    return {
+        "success": True,
+        "session_store": await asyncio.to_thread(sessions.stats),
+        "context_manager": context_manager.stats()
     }
 
 
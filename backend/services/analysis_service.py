@@ -1,73 +1,169 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from .document_parser import extract_skills, extract_experience_years
 from .deepseek_service import DeepseekService
-import re
+from .embedding_cache import EmbeddingCache
+from .embedding_batcher import EmbeddingBatcher
+from .embedding_backend import load_embedding_backend
+from .worker_pool import WorkerPool
+from .llm_cache import LLMResponseCache
+from .tfidf_model import TfidfModel
+from .chunking import DocumentChunker, best_match_means, chunk_centroids, normalize_rows
+from .skill_taxonomy import SKILL_TAXONOMY
+from .metrics import LLM_JSON_PARSE_FAILURES, stage
 import os
 import asyncio
+import threading
+import time
+
+# sklearn, torch and sentence-transformers are imported lazily (see _load_semantic_model and
+# the scoring methods) so importing this module and starting the API stays fast.
+
+
+_worker_service = None
+
+
+def _run_stage_in_worker(stage: str, *args):
+    # Entry point for process pools: each worker process builds its own service
+    # (and model) once, then runs the requested synchronous stage locally.
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = AnalysisService()
+    return getattr(_worker_service, stage)(*args)
 
-try:
-    from sentence_transformers import SentenceTransformer
-    HAS_SENTENCE_TRANSFORMER = True
-except ImportError:
-    HAS_SENTENCE_TRANSFORMER = False
 
 class AnalysisService:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
+    def __init__(self, deepseek_service: Optional[DeepseekService] = None, worker_pool: Optional[WorkerPool] = None):
+        self._worker_pool = worker_pool
+        self.llm_deadline_seconds = float(os.getenv("ANALYSIS_LLM_DEADLINE_SECONDS", "20"))
+        self.batch_llm_concurrency = int(os.getenv("ANALYSIS_BATCH_LLM_CONCURRENCY", "4"))
         self.common_skills = self._load_common_skills()
-        self.deepseek_service = DeepseekService()
-        
-        self.semantic_model = None
-        if HAS_SENTENCE_TRANSFORMER:
+        self.tfidf_model = TfidfModel.from_env()
+        self.deepseek_service = deepseek_service or DeepseekService()
+        
+        self.embedding_cache = EmbeddingCache.from_env()
+        self.llm_cache = LLMResponseCache.from_env()
+        self._background_tasks = set()
+        
+        self.semantic_model_name = 'all-MiniLM-L6-v2'
+        self._semantic_model = None
+        self._semantic_model_state = "not_loaded"
+        self._semantic_model_lock = threading.Lock()
+        self._embedding_batcher: Optional[EmbeddingBatcher] = None
+        self._embedding_batcher_lock = threading.Lock()
+        self.embedding_batching = os.getenv("EMBEDDING_BATCHING", "on").lower() not in ("0", "off", "false")
+        self.semantic_mode = os.getenv("SEMANTIC_MODE", "chunked")
+        if self.semantic_mode not in ("chunked", "head"):
+            raise ValueError(f"Unsupported semantic mode: {self.semantic_mode}")
+        self.chunker = DocumentChunker.from_env()
+    
+
+
+    @property
+    def semantic_model(self):
+        if self._semantic_model_state in ("loaded", "unavailable"):
+            return self._semantic_model
+        return self._load_semantic_model()
+    
+
+
+    def _load_semantic_model(self):
+        with self._semantic_model_lock:
+            # Re-check under the lock: another thread may have finished loading while we waited
+            if self._semantic_model_state in ("loaded", "unavailable"):
+                return self._semantic_model
+            
+            self._semantic_model_state = "loading"
             try:
-                self.semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
+                # fp32 PyTorch, int8-quantized PyTorch or ONNX Runtime, per EMBEDDING_BACKEND
+                self._semantic_model = load_embedding_backend(self.semantic_model_name)
+                self._semantic_model_state = "loaded"
+            except ImportError:
+                self._semantic_model = None
+                self._semantic_model_state = "unavailable"
             except Exception as e:
                 print(f"Warning: Could not load semantic model: {e}")
-                self.semantic_model = None
+                self._semantic_model = None
+                self._semantic_model_state = "unavailable"
+            return self._semantic_model
     
 
 
-    def _load_common_skills(self) -> Dict[str, List[str]]:
+    def warm_up(self) -> None:
+        # Import the scoring stack and load the models ahead of the first request
+        self.tfidf_model.load()
+        self._load_semantic_model()
+    
+
+
+    def readiness(self) -> Dict[str, Any]:
+        state = self._semantic_model_state
         return {
-            "languages": ["python", "java", "javascript", "typescript", "c++", "c#", "ruby", "php", "golang", "rust", "r", "scala"],
-            "frontend": ["react", "vue", "angular", "svelte", "next.js", "nuxt", "html", "css", "sass", "tailwind", "bootstrap"],
-            "backend": ["express", "django", "flask", "fastapi", "spring", "laravel", "rails", "asp.net"],
-            "databases": ["sql", "mongodb", "postgresql", "mysql", "redis", "elasticsearch", "dynamodb", "cassandra"],
-            "devops": ["docker", "kubernetes", "aws", "gcp", "azure", "ci/cd", "jenkins", "github actions", "terraform"],
-            "ai_ml": ["machine learning", "deep learning", "nlp", "computer vision", "tensorflow", "pytorch", "scikit-learn", "keras"],
-            "tools": ["git", "github", "gitlab", "jira", "confluence", "slack", "figma"],
+            "ready": state in ("loaded", "unavailable"),
+            "semantic_model": {
+                "name": self.semantic_model_name,
+                "state": state,
+                "backend": self._semantic_model.info() if state == "loaded" else None
+            }
         }
     
 
 
-    async def analyze(self, resume_text: str, job_description_text: str) -> Dict[str, Any]:
-        resume_skills = extract_skills(resume_text)
-        jd_skills = extract_skills(job_description_text)
-        resume_experience = extract_experience_years(resume_text)
-        
-        gap_analysis = self._perform_gap_analysis(resume_skills, jd_skills, resume_text, job_description_text)
-        
-        strengths = self._extract_strengths(resume_skills, jd_skills, resume_text, job_description_text)
-        
-        recommendations = self._generate_recommendations(gap_analysis, resume_skills, jd_skills)
-        
-        actionable_tip = self._generate_actionable_tip(resume_text, job_description_text, resume_skills, jd_skills)
+    @property
+    def worker_pool(self) -> WorkerPool:
+        if self._worker_pool is None:
+            self._worker_pool = WorkerPool.from_env()
+        return self._worker_pool
+    
+
+
+    async def _run_stage(self, stage_name: str, *args):
+        # Timed from the event loop, so queueing in the pool counts and process workers are covered too
+        with stage(stage_name.lstrip("_")):
+            if self.worker_pool.kind == "process":
+                return await self.worker_pool.run(_run_stage_in_worker, stage_name, *args)
+            return await self.worker_pool.run(getattr(self, stage_name), *args)
+    
+
+
+    def _load_common_skills(self) -> Dict[str, List[str]]:
+        return SKILL_TAXONOMY.skills_by_category()
+    
+
+
+    async def analyze(self, resume_text: str, job_description_text: str, bypass_cache: bool = False) -> Dict[str, Any]:
+        started_at = time.monotonic()
         
-        skills_match = self._analyze_skills_match(resume_skills, jd_skills)
+        # CPU-bound stages run in the worker pool so the event loop keeps serving other requests
+        features = await self._run_stage("_extract_features", resume_text, job_description_text)
+        resume_skills = features["resume_skills"]
+        jd_skills = features["jd_skills"]
+        gap_analysis = features["gap_analysis"]
+        strengths = features["strengths"]
+        recommendations = features["recommendations"]
+        actionable_tip = features["actionable_tip"]
+        skills_match = features["skills_match"]
         
-        deepseek_analysis = await self._get_deepseek_detailed_analysis(resume_text, job_description_text, resume_skills, jd_skills, gap_analysis)
+        # The LLM call starts as soon as its prompt inputs exist and runs alongside local scoring
+        llm_task = asyncio.create_task(
+            self._get_deepseek_detailed_analysis(resume_text, job_description_text, resume_skills, jd_skills, gap_analysis, bypass_cache)
+        )
+        try:
+            hf_match_score, deepseek_analysis = await asyncio.gather(
+                self._run_stage("_calculate_match_score", resume_text, job_description_text, resume_skills, jd_skills),
+                self._await_llm_within_deadline(llm_task, started_at)
+            )
+        except BaseException:
+            llm_task.cancel()
+            raise
         
         # HYBRID SCORE CALCULATION
-        hf_match_score = self._calculate_match_score(resume_text, job_description_text, resume_skills, jd_skills)
-        deepseek_readiness = deepseek_analysis.get("structured_insights", {}).get("readiness_percentage", 50)
-        
-        hf_score_normalized = (hf_match_score / 10) * 100
-        combined_match_score = (hf_score_normalized * 0.35) + (deepseek_readiness * 0.65)
-        final_match_score = (combined_match_score / 100) * 10 
+        llm_fallback_reason = self._llm_fallback_reason(deepseek_analysis)
+        if llm_fallback_reason:
+            final_match_score = hf_match_score
+        else:
+            final_match_score = self._blend_match_score(hf_match_score, deepseek_analysis)
         match_level = self._get_match_level(final_match_score)
         
         hybrid_analysis = self._perform_hybrid_analysis(
@@ -89,6 +185,9 @@ class AnalysisService:
             "actionable_tip": actionable_tip,
             "deepseek_analysis": deepseek_analysis,
             "hybrid_analysis": hybrid_analysis,
+            "score_source": "local_only" if llm_fallback_reason else "hybrid",
+            "llm_fallback": llm_fallback_reason is not None,
+            "llm_fallback_reason": llm_fallback_reason,
             "resume_skills_count": len(resume_skills),
             "jd_skills_count": len(jd_skills),
             "matched_skills_count": len(set(resume_skills) & set(jd_skills))
@@ -96,39 +195,350 @@ class AnalysisService:
     
 
 
-    def _calculate_match_score(self, resume_text: str, jd_text: str, resume_skills: List[str], jd_skills: List[str]) -> float:
-        scores = []
+    async def analyze_many(self, resume_text: str, jds: List[Dict[str, Any]], bypass_cache: bool = False) -> List[Dict[str, Any]]:
+        started_at = time.monotonic()
+        jd_texts = [jd["job_description_text"] for jd in jds]
+        local_results = await self._run_stage("_score_many_locally", resume_text, jd_texts)
+        resume_skills = local_results["resume_skills"]
+        
+        results = []
+        enrichment_tasks = []
+        # One batch must not open a connection per JD: at most batch_llm_concurrency calls run at once
+        llm_slots = asyncio.Semaphore(max(self.batch_llm_concurrency, 1))
+        for index, (jd, jd_text, jd_skills, hf_match_score, gap_analysis) in enumerate(zip(
+            jds, jd_texts, local_results["jd_skills"], local_results["hf_match_scores"], local_results["gap_analyses"]
+        )):
+            results.append({
+                "index": index,
+                "job_id": jd.get("job_id"),
+                "match_score": round(hf_match_score, 1),
+                "match_level": self._get_match_level(hf_match_score),
+                "hf_match_score": round(hf_match_score, 1),
+                "skills_match": self._analyze_skills_match(resume_skills, jd_skills),
+                "gap_analysis": gap_analysis,
+                "jd_skills_count": len(jd_skills),
+                "matched_skills_count": len(set(resume_skills) & set(jd_skills))
+            })
+            if jd.get("include_ai_analysis"):
+                enrichment_tasks.append((index, asyncio.create_task(self._bounded_detailed_analysis(
+                    llm_slots, resume_text, jd_text, resume_skills, jd_skills, gap_analysis, bypass_cache
+                ))))
+        
+        if enrichment_tasks:
+            # The same deadline as a single analysis, counted from the start of the batch; a JD that
+            # misses it falls back to its local score while its call finishes into the cache
+            try:
+                enrichments = await asyncio.gather(*(
+                    self._await_llm_within_deadline(task, started_at) for _, task in enrichment_tasks
+                ))
+            except BaseException:
+                for _, task in enrichment_tasks:
+                    task.cancel()
+                raise
+            for (index, _), deepseek_analysis in zip(enrichment_tasks, enrichments):
+                result = results[index]
+                result["deepseek_analysis"] = deepseek_analysis
+                llm_fallback_reason = self._llm_fallback_reason(deepseek_analysis)
+                result["llm_fallback_reason"] = llm_fallback_reason
+                if llm_fallback_reason:
+                    continue
+                final_match_score = self._blend_match_score(result["hf_match_score"], deepseek_analysis)
+                result["match_score"] = round(final_match_score, 1)
+                result["match_level"] = self._get_match_level(final_match_score)
+        
+        results.sort(key=lambda r: r["match_score"], reverse=True)
+        for rank, result in enumerate(results, start=1):
+            result["rank"] = rank
+        
+        return results
+    
+
+
+    async def _bounded_detailed_analysis(self, slots: asyncio.Semaphore, *args) -> Dict[str, Any]:
+        async with slots:
+            return await self._get_deepseek_detailed_analysis(*args)
+    
+
+
+    async def _await_llm_within_deadline(self, llm_task: asyncio.Task, started_at: float) -> Dict[str, Any]:
+        if self.llm_deadline_seconds <= 0:
+            return await llm_task
         
-        if len(jd_skills) > 0:
-            skill_match_ratio = len(set(resume_skills) & set(jd_skills)) / len(jd_skills)
-        else:
-            skill_match_ratio = 0
-        scores.append(skill_match_ratio * 4)
+        remaining = self.llm_deadline_seconds - (time.monotonic() - started_at)
+        try:
+            # Shielded so a late answer still completes and lands in the LLM cache for the next request
+            return await asyncio.wait_for(asyncio.shield(llm_task), timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            self._background_tasks.add(llm_task)
+            llm_task.add_done_callback(self._background_tasks.discard)
+            return {
+                "structured_insights": {
+                    "summary": "AI analysis took too long, so this result is based on local analysis only.",
+                    "fit_score": 0,
+                    "key_strengths": [],
+                    "critical_gaps": [],
+                    "learning_path": [],
+                    "next_steps": []
+                },
+                "analysis_source": "Timeout",
+                "error": f"AI analysis exceeded the {self.llm_deadline_seconds:g}s deadline"
+            }
+    
+
+
+    def _llm_fallback_reason(self, deepseek_analysis: Dict[str, Any]) -> Optional[str]:
+        source = deepseek_analysis.get("analysis_source")
+        if source == "Timeout":
+            return "timeout"
+        if source == "Error":
+            return "error"
+        # Without parsed JSON there is no readiness to blend, only the default
+        if source == "Unparsed":
+            return "unparseable_response"
+        return None
+    
+
+
+    def _extract_features(self, resume_text: str, job_description_text: str) -> Dict[str, Any]:
+        with stage("skill_extraction"):
+            resume_skills = extract_skills(resume_text)
+            jd_skills = extract_skills(job_description_text)
+        gap_analysis = self._perform_gap_analysis(resume_skills, jd_skills, resume_text, job_description_text)
+        
+        return {
+            "resume_skills": resume_skills,
+            "jd_skills": jd_skills,
+            "resume_experience": extract_experience_years(resume_text),
+            "gap_analysis": gap_analysis,
+            "strengths": self._extract_strengths(resume_skills, jd_skills, resume_text, job_description_text),
+            "recommendations": self._generate_recommendations(gap_analysis, resume_skills, jd_skills),
+            "actionable_tip": self._generate_actionable_tip(resume_text, job_description_text, resume_skills, jd_skills),
+            "skills_match": self._analyze_skills_match(resume_skills, jd_skills)
+        }
+    
+
+
+    def _score_pair_locally(self, resume_text: str, job_description_text: str) -> Dict[str, Any]:
+        resume_skills = extract_skills(resume_text)
+        jd_skills = extract_skills(job_description_text)
+        match_score = self._calculate_match_score(resume_text, job_description_text, resume_skills, jd_skills)
+        
+        return {
+            "match_score": round(match_score, 1),
+            "match_level": self._get_match_level(match_score),
+            "skills_match": self._analyze_skills_match(resume_skills, jd_skills),
+            "score_source": "local_only"
+        }
+    
+
+
+    def _score_many_locally(self, resume_text: str, jd_texts: List[str]) -> Dict[str, Any]:
+        resume_skills = extract_skills(resume_text)
+        jd_skills_list = [extract_skills(jd_text) for jd_text in jd_texts]
+        
+        return {
+            "resume_skills": resume_skills,
+            "jd_skills": jd_skills_list,
+            "hf_match_scores": self._calculate_match_scores_batch(resume_text, jd_texts, resume_skills, jd_skills_list),
+            "gap_analyses": [
+                self._perform_gap_analysis(resume_skills, jd_skills, resume_text, jd_text)
+                for jd_text, jd_skills in zip(jd_texts, jd_skills_list)
+            ]
+        }
+    
+
+
+    async def score_pair(self, resume_text: str, job_description_text: str) -> Dict[str, Any]:
+        return await self._run_stage("_score_pair_locally", resume_text, job_description_text)
+    
+
+
+    async def prepare_job_documents(self, jd_texts: List[str]) -> Dict[str, Any]:
+        return await self._run_stage("_prepare_job_documents", jd_texts)
+    
+
+
+    async def prepare_resume_query(self, resume_text: str) -> Dict[str, Any]:
+        return await self._run_stage("_prepare_resume_query", resume_text)
+    
+
+
+    def _prepare_job_documents(self, jd_texts: List[str]) -> Dict[str, Any]:
+        return {
+            "embeddings": self._document_embeddings(jd_texts),
+            "skills": [extract_skills(jd_text) for jd_text in jd_texts]
+        }
+    
+
+
+    def _prepare_resume_query(self, resume_text: str) -> Dict[str, Any]:
+        return {
+            "embedding": self._document_embeddings([resume_text])[0],
+            "skills": extract_skills(resume_text)
+        }
+    
+
+
+    def _document_embeddings(self, texts: List[str]) -> np.ndarray:
+        # The index holds one vector per document, so in chunked mode each document is the centroid
+        # of the same chunks pairwise scoring embeds (and shares their cache entries) rather than
+        # just its opening lines; head mode keeps the first 500 characters, as scoring does
+        if self.semantic_model is None:
+            raise RuntimeError("Semantic model is not available")
+        if self.semantic_mode == "head":
+            return normalize_rows(self._encode([text[:500] for text in texts]))
+
+        chunk_lists = [self.chunker.chunk(text) for text in texts]
+        embeddings = self._encode([chunk for chunks in chunk_lists for chunk in chunks])
+        return chunk_centroids(embeddings, [len(chunks) for chunks in chunk_lists])
+    
+
+
+    def _blend_match_score(self, hf_match_score: float, deepseek_analysis: Dict[str, Any]) -> float:
+        deepseek_readiness = deepseek_analysis.get("structured_insights", {}).get("readiness_percentage", 50)
+        
+        hf_score_normalized = (hf_match_score / 10) * 100
+        combined_match_score = (hf_score_normalized * 0.35) + (deepseek_readiness * 0.65)
+        return (combined_match_score / 100) * 10
+    
+
+
+    def _calculate_match_score(self, resume_text: str, jd_text: str, resume_skills: List[str], jd_skills: List[str]) -> float:
+        skill_match_ratio = self._skill_match_ratio(resume_skills, jd_skills)
         
         try:
-            tfidf_matrix = self.vectorizer.fit_transform([resume_text, jd_text])
-            tfidf_similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            with stage("tfidf"):
+                tfidf_similarity = float(self.tfidf_model.similarities(resume_text, [jd_text])[0])
         except:
             tfidf_similarity = 0
-        scores.append(tfidf_similarity * 3)
         
         semantic_similarity = 0
         if self.semantic_model:
             try:
-                resume_embedding = self.semantic_model.encode(resume_text[:500], convert_to_tensor=False)
-                jd_embedding = self.semantic_model.encode(jd_text[:500], convert_to_tensor=False)
-                semantic_similarity = float(cosine_similarity([resume_embedding], [jd_embedding])[0][0])
+                with stage("semantic"):
+                    semantic_similarity = float(self._semantic_similarities(resume_text, [jd_text])[0])
             except Exception as e:
                 print(f"Semantic similarity error: {e}")
                 semantic_similarity = 0
-        scores.append(semantic_similarity * 2)
         
-        important_keywords = self._extract_important_keywords(jd_text)
-        keyword_match = sum(1 for kw in important_keywords if kw.lower() in resume_text.lower()) / max(len(important_keywords), 1)
-        scores.append(keyword_match * 1)
+        with stage("keyword_match"):
+            keyword_match = self._keyword_match_ratio(resume_text.lower(), jd_text)
         
-        score = sum(scores)
-        return min(10, max(0, score))
+        return self._combine_match_components(skill_match_ratio, tfidf_similarity, semantic_similarity, keyword_match)
+    
+
+
+    def _calculate_match_scores_batch(self, resume_text: str, jd_texts: List[str], resume_skills: List[str], jd_skills_list: List[List[str]]) -> List[float]:
+        n_jds = len(jd_texts)
+        
+        skill_ratios = np.array([self._skill_match_ratio(resume_skills, jd_skills) for jd_skills in jd_skills_list])
+        
+        # One sparse transform of the whole batch, then a single (n x 1) similarity product
+        try:
+            with stage("tfidf"):
+                tfidf_similarities = self.tfidf_model.similarities(resume_text, jd_texts)
+        except:
+            tfidf_similarities = np.zeros(n_jds)
+        
+        semantic_similarities = np.zeros(n_jds)
+        if self.semantic_model:
+            try:
+                with stage("semantic"):
+                    semantic_similarities = self._semantic_similarities(resume_text, jd_texts)
+            except Exception as e:
+                print(f"Semantic similarity error: {e}")
+                semantic_similarities = np.zeros(n_jds)
+        
+        with stage("keyword_match"):
+            resume_lower = resume_text.lower()
+            keyword_matches = np.array([self._keyword_match_ratio(resume_lower, jd_text) for jd_text in jd_texts])
+        
+        scores = self._combine_match_components(skill_ratios, tfidf_similarities, semantic_similarities, keyword_matches)
+        return [float(score) for score in scores]
+    
+
+
+    def _semantic_similarities(self, resume_text: str, jd_texts: List[str]) -> np.ndarray:
+        if self.semantic_mode == "head":
+            from sklearn.metrics.pairwise import cosine_similarity
+            embeddings = self._encode([resume_text[:500]] + [jd_text[:500] for jd_text in jd_texts])
+            return cosine_similarity(embeddings[0:1], embeddings[1:])[0]
+        
+        # Whole documents: chunk everything, encode every chunk in one batch (cached per chunk),
+        # then score each JD by how well its requirements are covered somewhere in the resume
+        with stage("chunking"):
+            resume_chunks = self.chunker.chunk(resume_text)
+            jd_chunk_lists = [self.chunker.chunk(jd_text) for jd_text in jd_texts]
+        jd_chunks = [chunk for chunks in jd_chunk_lists for chunk in chunks]
+        embeddings = self._encode(resume_chunks + jd_chunks)
+        return best_match_means(
+            embeddings[:len(resume_chunks)],
+            embeddings[len(resume_chunks):],
+            [len(chunks) for chunks in jd_chunk_lists]
+        )
+    
+
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.embedding_cache.encode(
+            self.semantic_model.cache_namespace,
+            texts,
+            self._encode_uncached
+        )
+    
+
+
+    def _encode_uncached(self, batch: List[str]):
+        # Only cache misses get here, so this isolates model time from cache lookups
+        if self.embedding_batching:
+            # Concurrent analyses share one batched forward pass instead of encoding one by one;
+            # the batcher records queue wait and model time as separate stages
+            return self.embedding_batcher.encode(batch)
+        with stage("embedding_model"):
+            return self.semantic_model.encode(batch)
+    
+
+
+    @property
+    def embedding_batcher(self) -> EmbeddingBatcher:
+        if self._embedding_batcher is None:
+            with self._embedding_batcher_lock:
+                if self._embedding_batcher is None:
+                    self._embedding_batcher = EmbeddingBatcher.from_env(self._encode_batch)
+        return self._embedding_batcher
+    
+
+
+    def _encode_batch(self, texts: List[str]):
+        return self.semantic_model.encode(texts)
+    
+
+
+    def close(self) -> None:
+        if self._embedding_batcher is not None:
+            self._embedding_batcher.close()
+        self.worker_pool.shutdown()
+    
+
+
+    def _skill_match_ratio(self, resume_skills: List[str], jd_skills: List[str]) -> float:
+        jd_mask = SKILL_TAXONOMY.mask(jd_skills)
+        if jd_mask:
+            return (SKILL_TAXONOMY.mask(resume_skills) & jd_mask).bit_count() / jd_mask.bit_count()
+        return 0
+    
+
+
+    def _keyword_match_ratio(self, resume_text_lower: str, jd_text: str) -> float:
+        important_keywords = self._extract_important_keywords(jd_text)
+        return sum(1 for kw in important_keywords if kw.lower() in resume_text_lower) / max(len(important_keywords), 1)
+    
+
+
+    def _combine_match_components(self, skill_match_ratio, tfidf_similarity, semantic_similarity, keyword_match):
+        # Works on scalars or NumPy arrays so single and batch scoring share the same weights
+        score = (skill_match_ratio * 4) + (tfidf_similarity * 3) + (semantic_similarity * 2) + (keyword_match * 1)
+        return np.clip(score, 0, 10) if isinstance(score, np.ndarray) else min(10, max(0, score))
     
 
 
@@ -148,10 +558,13 @@ class AnalysisService:
 
     def _perform_gap_analysis(self, resume_skills: List[str], jd_skills: List[str], resume_text: str, jd_text: str) -> List[Dict[str, Any]]:
         gaps = []
-        missing_skills = set(jd_skills) - set(resume_skills)
+        resume_mask = SKILL_TAXONOMY.mask(resume_skills)
+        missing_mask = SKILL_TAXONOMY.mask(jd_skills) & ~resume_mask
+        # JD order, so the first gaps reported are the ones the posting mentions first
+        missing_skills = [skill for skill in dict.fromkeys(jd_skills) if SKILL_TAXONOMY.has(missing_mask, skill)]
         
         for skill in missing_skills:
-            transferable = self._find_transferable_skills(skill, resume_skills)
+            transferable = self._find_transferable_skills(skill, resume_skills, resume_mask)
             
             gaps.append({
                 "skill": skill,
@@ -217,35 +630,28 @@ class AnalysisService:
 
 
     def _analyze_skills_match(self, resume_skills: List[str], jd_skills: List[str]) -> Dict[str, Any]:
-        
-        matched = set(resume_skills) & set(jd_skills)
-        missing = set(jd_skills) - set(resume_skills)
-        extra = set(resume_skills) - set(jd_skills)
+        resume_mask = SKILL_TAXONOMY.mask(resume_skills)
+        jd_mask = SKILL_TAXONOMY.mask(jd_skills)
+        matched = resume_mask & jd_mask
+        missing = jd_mask & ~resume_mask
+        extra = resume_mask & ~jd_mask
         
         return {
-            "matched_skills": list(matched),
-            "missing_skills": list(missing),
-            "extra_skills": list(extra),
-            "match_percentage": round((len(matched) / max(len(jd_skills), 1)) * 100, 1),
-            "matched_count": len(matched),
-            "missing_count": len(missing),
-            "total_required": len(jd_skills)
+            "matched_skills": SKILL_TAXONOMY.names(matched),
+            "missing_skills": SKILL_TAXONOMY.names(missing),
+            "extra_skills": SKILL_TAXONOMY.names(extra),
+            "match_percentage": round((matched.bit_count() / max(jd_mask.bit_count(), 1)) * 100, 1),
+            "matched_count": matched.bit_count(),
+            "missing_count": missing.bit_count(),
+            "total_required": jd_mask.bit_count()
         }
     
 
 
-    def _find_transferable_skills(self, skill: str, resume_skills: List[str]) -> List[str]:
-
-        skill_relationships = {
-            "docker": ["kubernetes", "devops", "ci/cd"],
-            "aws": ["azure", "gcp", "cloud"],
-            "react": ["vue", "angular", "javascript", "frontend"],
-            "python": ["java", "javascript", "programming"],
-            "sql": ["mongodb", "databases", "data"],
-        }
-        
-        transferable = skill_relationships.get(skill.lower(), [])
-        return [s for s in transferable if s in resume_skills]
+    def _find_transferable_skills(self, skill: str, resume_skills: List[str], resume_mask: Optional[int] = None) -> List[str]:
+        if resume_mask is None:
+            resume_mask = SKILL_TAXONOMY.mask(resume_skills)
+        return SKILL_TAXONOMY.related(skill, resume_mask)
     
 
 
@@ -277,10 +683,13 @@ class AnalysisService:
 
     async def _get_deepseek_detailed_analysis(self, resume_text: str, job_description_text: str, 
                                               resume_skills: List[str], jd_skills: List[str], 
-                                              gap_analysis: List[Dict]) -> Dict[str, Any]:
+                                              gap_analysis: List[Dict], bypass_cache: bool = False) -> Dict[str, Any]:
         try:
+            # The prompt is the LLM cache key, so every list in it needs a stable order: set iteration
+            # changes with PYTHONHASHSEED and would miss the persistent cache after each restart.
+            # Skill lists and gaps already follow document order.
             missing_skills = [g['skill'] for g in gap_analysis[:5]]
-            matched_skills = list(set(resume_skills) & set(jd_skills))
+            matched_skills = sorted(set(resume_skills) & set(jd_skills))
             
             prompt = f"""Analyze this job fit and respond ONLY with valid JSON (no markdown, no extra text).
 
@@ -311,10 +720,26 @@ Return ONLY this JSON structure (no other text):
   "next_steps": ["<specific action>"]
 }}"""
 
-            response = await self.deepseek_service.chat(
+            cache_key = LLMResponseCache.make_key(self.deepseek_service.model, prompt, self.deepseek_service.temperature)
+            if bypass_cache:
+                self.llm_cache.record_bypass()
+            else:
+                cached_insights = await self.llm_cache.aget(cache_key)
+                if cached_insights is not None:
+                    return {
+                        "structured_insights": cached_insights,
+                        "analysis_source": "AI Analysis",
+                        "cached": True,
+                        "timestamp": str(__import__('datetime').datetime.now())
+                    }
+            
+            upstream_started_at = time.monotonic()
+            # Raises on a missing key, HTTP or connection errors, which end up as an "Error" result below
+            response = await self.deepseek_service.complete(
                 messages=[{"role": "user", "content": prompt}],
                 context=None
             )
+            upstream_latency = time.monotonic() - upstream_started_at
             
             try:
                 json_str = response
@@ -323,13 +748,19 @@ Return ONLY this JSON structure (no other text):
                 elif "```" in response:
                     json_str = response.split("```")[1].split("```")[0]
                 
-                structured_data = json.loads(json_str.strip())
+                with stage("llm_json_parse"):
+                    structured_data = json.loads(json_str.strip())
+                if not isinstance(structured_data, dict):
+                    raise json.JSONDecodeError("Expected a JSON object", json_str, 0)
+                # Only successfully parsed answers are cached; error text and fallbacks never are
+                await self.llm_cache.aput(cache_key, structured_data, upstream_latency)
                 return {
                     "structured_insights": structured_data,
                     "analysis_source": "AI Analysis",
                     "timestamp": str(__import__('datetime').datetime.now())
                 }
             except json.JSONDecodeError:
+                LLM_JSON_PARSE_FAILURES.inc(source="detailed_analysis")
                 return {
                     "structured_insights": {
                         "summary": response[:500],
@@ -339,7 +770,7 @@ Return ONLY this JSON structure (no other text):
                         "learning_path": [],
                         "next_steps": ["Unable to parse detailed analysis. Please review the summary above."]
                     },
-                    "analysis_source": "AI Analysis",
+                    "analysis_source": "Unparsed",
                     "timestamp": str(__import__('datetime').datetime.now())
                 }
         except Exception as e:
@@ -484,19 +915,4 @@ Return ONLY this JSON structure (no other text):
 
     
     def _categorize_skills(self, resume_skills: List[str], jd_skills: List[str]) -> List[Dict]:
-        categories = {}
-        common_skills = self._load_common_skills()
-        
-        for category, skills_list in common_skills.items():
-            matched = [s for s in resume_skills if s.lower() in [sk.lower() for sk in skills_list]]
-            required = [s for s in jd_skills if s.lower() in [sk.lower() for sk in skills_list]]
-            
-            if required:
-                categories[category] = {
-                    "category": category.replace("_", " ").title(),
-                    "matched": len(matched),
-                    "required": len(required),
-                    "percentage": round((len(matched) / len(required) * 100) if required else 0, 1)
-                }
-        
-        return list(categories.values())
+        return SKILL_TAXONOMY.category_breakdown(SKILL_TAXONOMY.mask(resume_skills), SKILL_TAXONOMY.mask(jd_skills))
@@ -0,0 +1,151 @@
+from typing import List, Sequence
+import os
+import re
+import numpy as np
+
+_SECTION_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?;])\s+(?=[A-Z0-9\-•*])')
+_BULLET_LINE = re.compile(r'^\s*(?:[-*•●]|\d+[.)])\s+')
+
+
+class DocumentChunker:
+    # Splits a document into section- and sentence-aligned windows of at most max_chars,
+    # so every part of a resume or JD can be embedded without one encode per sentence.
+    # Every limit is a size, never a clock, so the same text always gives the same chunks.
+    def __init__(self, max_chars: int = 400, max_chunks: int = 32, max_input_chars: int = 100000):
+        self.max_chars = max_chars
+        self.max_chunks = max_chunks
+        self.max_input_chars = max_input_chars
+
+
+
+    @classmethod
+    def from_env(cls) -> "DocumentChunker":
+        return cls(
+            max_chars=int(os.getenv("CHUNK_MAX_CHARS", "400")),
+            max_chunks=int(os.getenv("CHUNK_MAX_PER_DOCUMENT", "32")),
+            max_input_chars=int(os.getenv("CHUNK_MAX_INPUT_CHARS", "100000"))
+        )
+
+
+
+    def chunk(self, text: str) -> List[str]:
+        # Bounds the splitting work on pathological inputs; ~100k characters is a 40-50 page document
+        text = text[:self.max_input_chars]
+        sections: List[List[str]] = []
+        seen = set()
+
+        for section in _SECTION_BREAK.split(text):
+            windows = []
+            for window in self._pack(self._sentences(section)):
+                key = window.lower()
+                if key not in seen:
+                    seen.add(key)
+                    windows.append(window)
+            if windows:
+                sections.append(windows)
+
+        if not sections:
+            return [" ".join(text.split())[:self.max_chars]]
+        return self._spread(sections)
+
+
+
+    def _sentences(self, section: str) -> List[str]:
+        # Bullet and heading lines are units of their own; prose lines are split into sentences
+        sentences = []
+        for line in section.split("\n"):
+            line = " ".join(line.split())
+            if not line:
+                continue
+            if _BULLET_LINE.match(line):
+                sentences.append(line)
+            else:
+                sentences.extend(part for part in _SENTENCE_BREAK.split(line) if part)
+        return sentences
+
+
+
+    def _pack(self, sentences: List[str]) -> List[str]:
+        windows = []
+        current = ""
+        for sentence in sentences:
+            while len(sentence) > self.max_chars:
+                # One over-long sentence: cut on whitespace near the limit
+                cut = sentence.rfind(" ", 0, self.max_chars)
+                cut = cut if cut > self.max_chars // 2 else self.max_chars
+                if current:
+                    windows.append(current)
+                    current = ""
+                windows.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if current and len(current) + 1 + len(sentence) > self.max_chars:
+                windows.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            windows.append(current)
+        return windows
+
+
+
+    def _spread(self, sections: List[List[str]]) -> List[str]:
+        if sum(len(windows) for windows in sections) <= self.max_chunks:
+            return [window for windows in sections for window in windows]
+
+        if len(sections) >= self.max_chunks:
+            # More sections than slots: the first window of evenly spaced sections
+            return [sections[position][0] for position in _even_positions(len(sections), self.max_chunks)]
+
+        # Over the cap: every section keeps a window, the remaining slots go round-robin to sections
+        # with windows left, and each section keeps evenly spaced windows so coverage spans the document
+        quotas = [1] * len(sections)
+        remaining = self.max_chunks - len(sections)
+        while remaining:
+            for index, windows in enumerate(sections):
+                if remaining and quotas[index] < len(windows):
+                    quotas[index] += 1
+                    remaining -= 1
+        return [
+            windows[position]
+            for windows, quota in zip(sections, quotas)
+            for position in _even_positions(len(windows), quota)
+        ]
+
+
+
+def _even_positions(count: int, keep: int) -> List[int]:
+    return np.linspace(0, count - 1, keep).round().astype(int).tolist()
+
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+
+def best_match_means(resume_vectors: np.ndarray, jd_vectors: np.ndarray, jd_chunk_counts: Sequence[int]) -> np.ndarray:
+    # For every JD chunk (a requirement), the similarity of its best-matching resume chunk;
+    # each JD's score is the mean over its own chunks. All JDs share one matrix product and
+    # the per-JD means come from a single reduceat over the chunk offsets.
+    counts = np.asarray(jd_chunk_counts, dtype=np.int64)
+    if len(counts) == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    best = (normalize_rows(jd_vectors) @ normalize_rows(resume_vectors).T).max(axis=1)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return np.add.reduceat(best, offsets) / np.maximum(counts, 1)
+
+
+
+def chunk_centroids(chunk_vectors: np.ndarray, chunk_counts: Sequence[int]) -> np.ndarray:
+    # One unit vector per document: the mean direction of its normalised chunk embeddings,
+    # for places that need a single vector per document (the job index's dense product)
+    counts = np.asarray(chunk_counts, dtype=np.int64)
+    if len(counts) == 0:
+        return np.zeros((0, chunk_vectors.shape[1] if chunk_vectors.ndim == 2 else 0), dtype=np.float32)
+
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return normalize_rows(np.add.reduceat(normalize_rows(chunk_vectors), offsets, axis=0))
@@ -0,0 +1,245 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import threading
+import os
+
+from .deepseek_service import OpenRouterError
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+
+class TokenCounter:
+    def __init__(self, encoding_name: str = "cl100k_base", cache_size: int = 4096):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._encoding_loaded = False
+        self._encoding_lock = threading.Lock()
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._cache_size = cache_size
+        # Guards the cache; the generation changes when the tokenizer lands so counts computed
+        # before then are not written back over the cleared cache
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+
+
+
+    @property
+    def loaded(self) -> bool:
+        return self._encoding_loaded
+
+
+
+    def load(self, blocking: bool = True):
+        # Loaded on first use, not at import: on a cold cache tiktoken downloads its BPE file,
+        # which must not hold up startup (or hang it offline). Non-blocking callers get None
+        # while another thread is still loading, and estimate instead of waiting.
+        if self._encoding_loaded:
+            return self._encoding
+        if not self._encoding_lock.acquire(blocking=blocking):
+            return None
+        try:
+            if not self._encoding_loaded:
+                if HAS_TIKTOKEN:
+                    try:
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                        # Drop counts memoised from the estimate while the tokenizer was loading
+                        with self._cache_lock:
+                            self._cache = OrderedDict()
+                            self._cache_generation += 1
+                    except Exception as e:
+                        print(f"Warning: Could not load tokenizer {self.encoding_name}, estimating token counts: {e}")
+                self._encoding_loaded = True
+            return self._encoding
+        finally:
+            self._encoding_lock.release()
+
+
+
+    @property
+    def kind(self) -> str:
+        if not self._encoding_loaded:
+            return "not_loaded"
+        return "tiktoken" if self._encoding is not None else "estimate"
+
+
+
+    def count(self, text: str) -> int:
+        # Messages are re-counted on every turn, so counts are memoised by content
+        with self._cache_lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+            generation = self._cache_generation
+
+        encoding = self.load(blocking=False)
+        if encoding is not None:
+            tokens = len(encoding.encode(text, disallowed_special=()))
+        else:
+            # Roughly four characters per token; close enough for budgeting
+            tokens = len(text) // 4 + 1
+
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._cache[text] = tokens
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return tokens
+
+
+
+class ConversationContextManager:
+    def __init__(self, session_store, deepseek_service, token_budget: int = 3000, min_recent_messages: int = 2,
+                 summary_max_tokens: int = 400, summary_mode: str = "extractive", tokenizer_load_timeout: float = 10):
+        if summary_mode not in ("extractive", "llm"):
+            raise ValueError(f"Unsupported summary mode: {summary_mode}")
+
+        self.session_store = session_store
+        self.deepseek_service = deepseek_service
+        self.token_budget = token_budget
+        self.min_recent_messages = min_recent_messages
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_mode = summary_mode
+        self.token_counter = TokenCounter()
+        self.tokenizer_load_timeout = tokenizer_load_timeout
+
+        self.summaries_computed = 0
+        self.summaries_reused = 0
+
+
+
+    @classmethod
+    def from_env(cls, session_store, deepseek_service) -> "ConversationContextManager":
+        return cls(
+            session_store,
+            deepseek_service,
+            token_budget=int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "3000")),
+            min_recent_messages=int(os.getenv("CHAT_CONTEXT_MIN_RECENT_MESSAGES", "2")),
+            summary_max_tokens=int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400")),
+            summary_mode=os.getenv("CHAT_SUMMARY_MODE", "extractive")
+        )
+
+
+
+    async def prepare(self, session_id: str, session: Dict[str, Any], context: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        messages = session["messages"]
+        if not self.token_counter.loaded:
+            # The first load may download the tokenizer: it runs on a thread, and past the timeout
+            # this turn is budgeted with the estimate while the load carries on in the background
+            try:
+                await asyncio.wait_for(asyncio.to_thread(self.token_counter.load), timeout=self.tokenizer_load_timeout)
+            except asyncio.TimeoutError:
+                print("Warning: Tokenizer is still loading, estimating token counts for now")
+
+        # Fit the newest turns into what the system prompt and a full-size summary leave over,
+        # so the window only moves when the conversation grows, not when the summary changes
+        system_tokens = self.token_counter.count(self.deepseek_service.system_message(context)) + self.summary_max_tokens
+        window_start = self._window_start(messages, self.token_budget - system_tokens)
+
+        summary = await self._summary_for_window(session_id, session, window_start)
+        return messages[window_start:], {**context, "summary": summary}
+
+
+
+    def _window_start(self, messages: List[Dict[str, str]], budget: int) -> int:
+        used = 0
+        start = len(messages)
+        while start > 0:
+            cost = self.token_counter.count(messages[start - 1]["content"]) + 4
+            kept = len(messages) - start
+            if used + cost > budget and kept >= self.min_recent_messages:
+                break
+            used += cost
+            start -= 1
+        return start
+
+
+
+    async def _summary_for_window(self, session_id: str, session: Dict[str, Any], window_start: int) -> Optional[str]:
+        if window_start == 0:
+            return session.get("summary")
+
+        messages = session["messages"]
+        boundary = self._fingerprint(messages[window_start - 1])
+        if session.get("summary_fingerprint") == boundary:
+            self.summaries_reused += 1
+            return session.get("summary")
+
+        # The window moved: fold only the turns that left it into the rolling summary.
+        # If the previous boundary is gone (trimmed history), rebuild from what is stored.
+        previous_end = self._find_boundary(messages, session.get("summary_fingerprint"), window_start)
+        previous_summary = session.get("summary") if previous_end is not None else None
+        evicted = messages[previous_end or 0:window_start]
+
+        summary = await self._summarize(previous_summary, evicted)
+        await asyncio.to_thread(self.session_store.set_summary, session_id, summary, boundary)
+        self.summaries_computed += 1
+        return summary
+
+
+
+    def _find_boundary(self, messages: List[Dict[str, str]], fingerprint: Optional[str], window_start: int) -> Optional[int]:
+        if not fingerprint:
+            return None
+        for index in range(window_start - 1, -1, -1):
+            if self._fingerprint(messages[index]) == fingerprint:
+                return index + 1
+        return None
+
+
+
+    def _fingerprint(self, message: Dict[str, str]) -> str:
+        return hashlib.sha256(f"{message['role']}\x00{message['content']}".encode("utf-8")).hexdigest()
+
+
+
+    async def _summarize(self, previous_summary: Optional[str], evicted: List[Dict[str, str]]) -> str:
+        if self.summary_mode == "llm" and self.deepseek_service.api_key:
+            transcript = "\n".join(f"{message['role'].title()}: {message['content']}" for message in evicted)
+            try:
+                response = await self.deepseek_service.complete(
+                    messages=[{
+                        "role": "user",
+                        "content": (
+                            "Update this running summary of a career advice conversation with the new turns below. "
+                            f"Keep it under {self.summary_max_tokens} tokens and keep concrete facts, goals and advice.\n\n"
+                            f"Current summary:\n{previous_summary or 'None'}\n\nNew turns:\n{transcript}"
+                        )
+                    }],
+                    context=None
+                )
+                return response.strip()
+            except OpenRouterError as e:
+                print(f"Warning: LLM summary failed, using extractive summary: {e}")
+
+        return self._extractive_summary(previous_summary, evicted)
+
+
+
+    def _extractive_summary(self, previous_summary: Optional[str], evicted: List[Dict[str, str]]) -> str:
+        lines = previous_summary.split("\n") if previous_summary else []
+        for message in evicted:
+            content = " ".join(message["content"].split())
+            lines.append(f"- {message['role'].title()}: {content[:200]}{'...' if len(content) > 200 else ''}")
+
+        # Rolling: the oldest lines fall off once the summary outgrows its own budget
+        while len(lines) > 1 and self.token_counter.count("\n".join(lines)) > self.summary_max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "token_budget": self.token_budget,
+            "summary_mode": self.summary_mode,
+            "tokenizer": self.token_counter.kind,
+            "summaries_computed": self.summaries_computed,
+            "summaries_reused": self.summaries_reused
+        }
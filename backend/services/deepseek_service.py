@@ -1,54 +1,297 @@
 import os
 import aiohttp
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import json
+import time
+
+from .metrics import REGISTRY, LLM_JSON_PARSE_FAILURES, record_stage
+
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "careercompass_openrouter_requests_total", "OpenRouter requests by operation and HTTP status", ("operation", "status")
+)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "careercompass_openrouter_request_duration_seconds", "OpenRouter request latency", ("operation",)
+)
+UPSTREAM_TOKENS = REGISTRY.counter(
+    "careercompass_openrouter_tokens_total", "Tokens reported in OpenRouter usage blocks", ("operation", "type")
+)
+
+class OpenRouterError(RuntimeError):
+    # status is the upstream HTTP status, or "error" / "not_configured" when there was no response
+    def __init__(self, message: str, status: Any = "error"):
+        super().__init__(message)
+        self.status = status
+
 
 class DeepseekService:
     def __init__(self):
         self.api_key = os.getenv("OPENROUTER_API_KEY")
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
         self.model = "tngtech/deepseek-r1t2-chimera:free"
+        self.temperature = 0.7
+        
+        self.pool_size = int(os.getenv("OPENROUTER_POOL_SIZE", "100"))
+        self.pool_size_per_host = int(os.getenv("OPENROUTER_POOL_SIZE_PER_HOST", "20"))
+        self.dns_cache_ttl = int(os.getenv("OPENROUTER_DNS_CACHE_TTL", "300"))
+        self.keepalive_timeout = float(os.getenv("OPENROUTER_KEEPALIVE_TIMEOUT", "60"))
+        self.connect_timeout = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10"))
+        self.read_timeout = float(os.getenv("OPENROUTER_READ_TIMEOUT", "120"))
+        
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pool_stats = {
+            "requests": 0,
+            "requests_in_flight": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connection_waits": 0,
+            "connections_waiting": 0,
+            "sessions_created": 0
+        }
+    
+
+
+    async def start(self):
+        if self._session is None or self._session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(self._on_connection_created)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+            trace_config.on_request_start.append(self._on_request_start)
+            trace_config.on_request_end.append(self._on_request_finished)
+            trace_config.on_request_exception.append(self._on_request_finished)
+            trace_config.on_connection_queued_start.append(self._on_connection_queued)
+            trace_config.on_connection_queued_end.append(self._on_connection_dequeued)
+            
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    connect=self.connect_timeout,
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout
+                ),
+                trace_configs=[trace_config]
+            )
+            self._pool_stats["sessions_created"] += 1
+        return self._session
+    
+
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Normally opened on app startup; created lazily for callers outside the app lifecycle
+        if self._session is None or self._session.closed:
+            return await self.start()
+        return self._session
+    
+
+
+    async def _on_request_start(self, session, trace_config_ctx, params):
+        self._pool_stats["requests"] += 1
+        self._pool_stats["requests_in_flight"] += 1
+    
+
+
+    async def _on_request_finished(self, session, trace_config_ctx, params):
+        # request_end fires once the response headers are in, so a streamed body still being read is not counted
+        self._pool_stats["requests_in_flight"] -= 1
+    
+
+
+    async def _on_connection_queued(self, session, trace_config_ctx, params):
+        # Every pool connection was busy: the request waits for one to be released
+        self._pool_stats["connection_waits"] += 1
+        self._pool_stats["connections_waiting"] += 1
+    
+
+
+    async def _on_connection_dequeued(self, session, trace_config_ctx, params):
+        self._pool_stats["connections_waiting"] -= 1
+    
+
+
+    async def _on_connection_created(self, session, trace_config_ctx, params):
+        self._pool_stats["connections_created"] += 1
+    
+
+
+    async def _on_connection_reused(self, session, trace_config_ctx, params):
+        self._pool_stats["connections_reused"] += 1
+    
+
+
+    def pool_stats(self) -> Dict[str, Any]:
+        stats = dict(self._pool_stats)
+        acquired = stats["connections_created"] + stats["connections_reused"]
+        stats["reuse_rate"] = round(stats["connections_reused"] / acquired, 4) if acquired else 0.0
+        stats["pool_size"] = self.pool_size
+        stats["pool_size_per_host"] = self.pool_size_per_host
+        return stats
     
 
 
     async def chat(self, messages: List[Dict[str, str]], context: Optional[Dict[str, str]] = None) -> str:
+        # Chat replies show upstream problems to the user as text; callers that need to tell an
+        # answer from a failure use complete() instead
+        try:
+            return await self.complete(messages, context)
+        except OpenRouterError as e:
+            return str(e)
+    
+
+
+    async def complete(self, messages: List[Dict[str, str]], context: Optional[Dict[str, str]] = None) -> str:
         if not self.api_key:
-            return "OpenRouter API key not configured. Please set OPENROUTER_API_KEY environment variable."
+            raise OpenRouterError("OpenRouter API key not configured. Please set OPENROUTER_API_KEY environment variable.", "not_configured")
         
-        system_message = self._prepare_system_message(context)
+        system_message = self.system_message(context)
         
         api_messages = [{"role": "system", "content": system_message}]
         api_messages.extend(messages)
         
+        started = time.perf_counter()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://careercompass.app",
-                        "X-Title": "Career Compass"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": api_messages,
-                        "temperature": 0.7,
-                        "max_tokens": 2000
-                    }
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data['choices'][0]['message']['content']
-                    else:
-                        error_text = await response.text()
-                        return f"Error from OpenRouter API: {response.status} - {error_text}"
+            session = await self._get_session()
+            async with session.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://careercompass.app",
+                    "X-Title": "Career Compass"
+                },
+                json={
+                    "model": self.model,
+                    "messages": api_messages,
+                    "temperature": self.temperature,
+                    "max_tokens": 2000
+                }
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    self._record_upstream("chat", response.status, started, data.get("usage"))
+                    return data['choices'][0]['message']['content']
+                else:
+                    error_text = await response.text()
+                    self._record_upstream("chat", response.status, started)
+                    raise OpenRouterError(f"Error from OpenRouter API: {response.status} - {error_text}", response.status)
+        except OpenRouterError:
+            raise
         except Exception as e:
-            return f"Error communicating with OpenRouter: {str(e)}"
+            self._record_upstream("chat", "error", started)
+            raise OpenRouterError(f"Error communicating with OpenRouter: {str(e)}", "error") from e
     
 
 
-    def _prepare_system_message(self, context: Optional[Dict[str, str]]) -> str:
+    async def chat_stream(self, messages: List[Dict[str, str]], context: Optional[Dict[str, str]] = None) -> AsyncIterator[str]:
+        if not self.api_key:
+            yield "OpenRouter API key not configured. Please set OPENROUTER_API_KEY environment variable."
+            return
+        
+        system_message = self.system_message(context)
+        
+        api_messages = [{"role": "system", "content": system_message}]
+        api_messages.extend(messages)
+        
+        started = time.perf_counter()
+        status = "error"
+        usage = None
+        deltas = self._stream_deltas(api_messages)
+        try:
+            async for delta in deltas:
+                if isinstance(delta, dict):
+                    usage = delta
+                    continue
+                status = 200
+                yield delta
+            status = 200
+        except OpenRouterError as e:
+            status = e.status
+            raise
+        finally:
+            # Close the inner stream right away so a client disconnect still releases the connection
+            await deltas.aclose()
+            self._record_upstream("chat_stream", status, started, usage)
+    
+
+
+    async def _stream_deltas(self, api_messages: List[Dict[str, str]]) -> AsyncIterator[Any]:
+        session = await self._get_session()
+        # Leaving this context (normally, or via cancellation on client disconnect) releases
+        # the upstream connection, which stops generation on OpenRouter's side.
+        async with session.post(
+            f"{self.base_url}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream",
+                "HTTP-Referer": "https://careercompass.app",
+                "X-Title": "Career Compass"
+            },
+            json={
+                "model": self.model,
+                "messages": api_messages,
+                "temperature": self.temperature,
+                "max_tokens": 2000,
+                "stream": True
+            }
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise OpenRouterError(f"Error from OpenRouter API: {response.status} - {error_text}", response.status)
+            
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                # Blank keep-alives and ": OPENROUTER PROCESSING" comments carry no data
+                if not line.startswith("data:"):
+                    continue
+                
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                
+                try:
+                    chunk = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+                
+                if chunk.get("error"):
+                    raise OpenRouterError(f"Error from OpenRouter API: {chunk['error']}")
+                
+                # The final chunk may carry the usage block; it is passed up as a dict, not text
+                if chunk.get("usage"):
+                    yield chunk["usage"]
+                
+                choices = chunk.get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+    
+
+
+    def _record_upstream(self, operation: str, status: Any, started: float, usage: Optional[Dict[str, Any]] = None) -> None:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_REQUESTS.inc(operation=operation, status=status)
+        UPSTREAM_SECONDS.observe(elapsed, operation=operation)
+        record_stage("openrouter", elapsed)
+        if usage:
+            for token_type in ("prompt_tokens", "completion_tokens"):
+                if usage.get(token_type):
+                    UPSTREAM_TOKENS.inc(usage[token_type], operation=operation, type=token_type.replace("_tokens", ""))
+    
+
+
+    def system_message(self, context: Optional[Dict[str, str]]) -> str:
         base_message = """You are an expert career advisor and job application specialist. 
 You help students understand their job readiness and provide actionable guidance.
 Be specific, supportive, and practical in your advice."""
@@ -66,6 +309,9 @@ Be specific, supportive, and practical in your advice."""
             
             base_message += "\n\nUse this context to provide personalized advice about the user's fit for the role."
         
+        if context and context.get("summary"):
+            base_message += f"\n\nSummary of the earlier conversation:\n{context['summary']}"
+        
         return base_message
     
 
@@ -88,39 +334,44 @@ Job Description:
 
 Provide a JSON response with keys: fit_assessment, strengths, improvements, actionable_tip"""
         
+        started = time.perf_counter()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": "You are a career advisor. Respond in valid JSON format."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.7,
-                        "max_tokens": 1500
-                    }
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        response_text = data['choices'][0]['message']['content']
-                        
-                        try:
-                            json_start = response_text.find('{')
-                            json_end = response_text.rfind('}') + 1
-                            if json_start != -1 and json_end > json_start:
-                                json_str = response_text[json_start:json_end]
-                                return json.loads(json_str)
-                        except:
-                            pass
-                        
-                        return {"raw_analysis": response_text}
-                    else:
-                        return {"error": f"API error: {response.status}"}
+            session = await self._get_session()
+            async with session.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": "You are a career advisor. Respond in valid JSON format."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": self.temperature,
+                    "max_tokens": 1500
+                }
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    self._record_upstream("analyze", response.status, started, data.get("usage"))
+                    response_text = data['choices'][0]['message']['content']
+                    
+                    try:
+                        json_start = response_text.find('{')
+                        json_end = response_text.rfind('}') + 1
+                        if json_start != -1 and json_end > json_start:
+                            json_str = response_text[json_start:json_end]
+                            return json.loads(json_str)
+                    except:
+                        pass
+                    
+                    LLM_JSON_PARSE_FAILURES.inc(source="analyze_with_deepseek")
+                    return {"raw_analysis": response_text}
+                else:
+                    self._record_upstream("analyze", response.status, started)
+                    return {"error": f"API error: {response.status}"}
         except Exception as e:
+            self._record_upstream("analyze", "error", started)
             return {"error": str(e)}
@@ -1,84 +1,407 @@
-import PyPDF2
-from docx import Document
 import re
-from typing import Union
+from typing import Union, List, Dict, Tuple, Pattern, Iterator, Optional, Callable, Any
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import hashlib
+import mmap
+import time
+import zipfile
+import threading
+import os
 import io
 
+from .metrics import REGISTRY, record_stage
+from .skill_taxonomy import SKILL_TAXONOMY
+from .worker_pool import process_pool_context
+
+MAX_DOCUMENT_BYTES = int(os.getenv("PARSE_MAX_BYTES", str(20 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("PARSE_MAX_PDF_PAGES", "100"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PARSE_PDF_PARALLEL_MIN_PAGES", "24"))
+PDF_PAGES_PER_TASK = int(os.getenv("PARSE_PDF_PAGES_PER_TASK", "8"))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+PARSE_SECONDS = REGISTRY.histogram(
+    "careercompass_document_parse_duration_seconds", "Time spent parsing uploaded documents (cache misses only)", ("format",)
+)
+
+
+class DocumentTooLargeError(ValueError):
+    pass
+
+
+class ParseCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+
+    def get(self, digest: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(digest)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return text
+
+
+
+    def put(self, digest: str, text: str) -> None:
+        with self._lock:
+            self._entries[digest] = text
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+parse_cache = ParseCache(int(os.getenv("PARSE_CACHE_SIZE", "256")))
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+# Set in parse-pool workers: a worker parses its pages inline rather than starting a pool of its own
+_in_parse_worker = False
+
+
 
 def parse_resume(content: bytes, filename: str) -> str:
-    if filename.lower().endswith('.pdf'):
-        return parse_pdf(content)
-    elif filename.lower().endswith('.docx'):
-        return parse_docx(content)
-    elif filename.lower().endswith('.txt'):
-        return content.decode('utf-8')
-    else:
-        raise ValueError(f"Unsupported file format: {filename}")
+    return parse_document(content, filename)
 
 
 
 def parse_job_description(content: bytes, filename: str) -> str:
-    if filename.lower().endswith('.pdf'):
-        return parse_pdf(content)
-    elif filename.lower().endswith('.docx'):
-        return parse_docx(content)
-    elif filename.lower().endswith('.txt'):
-        return content.decode('utf-8')
-    else:
+    return parse_document(content, filename)
+
+
+
+def parse_document(content: bytes, filename: str, digest: Optional[str] = None) -> str:
+    extension = _extension_for(filename)
+    if len(content) > MAX_DOCUMENT_BYTES:
+        raise DocumentTooLargeError(f"File is larger than the {MAX_DOCUMENT_BYTES / (1024 * 1024):g} MB limit")
+
+    # Content-addressed: re-uploading the same bytes (under any filename) skips parsing
+    digest = digest or hashlib.sha256(content).hexdigest()
+    return _parse_cached(digest, extension, lambda: _STREAM_PARSERS[extension](io.BytesIO(content), content))
+
+
+
+def parse_document_file(path: str, filename: str, digest: str) -> str:
+    # Spooled uploads: the file is memory-mapped, so the parser pages it in from disk
+    # instead of holding a second full copy of the upload in the worker's heap.
+    extension = _extension_for(filename)
+    if os.path.getsize(path) > MAX_DOCUMENT_BYTES:
+        raise DocumentTooLargeError(f"File is larger than the {MAX_DOCUMENT_BYTES / (1024 * 1024):g} MB limit")
+
+    def parse() -> str:
+        with _open_mapped(path) as stream:
+            return _STREAM_PARSERS[extension](stream, path)
+
+    return _parse_cached(digest, extension, parse)
+
+
+
+async def parse_document_async(content: bytes, filename: str, digest: Optional[str] = None) -> str:
+    # Parsing is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(parse_document, content, filename, digest)
+
+
+
+async def parse_document_file_async(path: str, filename: str, digest: str) -> str:
+    return await asyncio.to_thread(parse_document_file, path, filename, digest)
+
+
+
+def _parse_cached(digest: str, extension: str, parse: Callable[[], str]) -> str:
+    cache_key = f"{digest}:{extension}"
+    text = parse_cache.get(cache_key)
+    if text is None:
+        started = time.perf_counter()
+        text = parse()
+        elapsed = time.perf_counter() - started
+        PARSE_SECONDS.observe(elapsed, format=extension.lstrip('.'))
+        record_stage("parse", elapsed)
+        parse_cache.put(cache_key, text)
+    return text
+
+
+
+def _extension_for(filename: str) -> str:
+    extension = os.path.splitext(filename.lower())[1]
+    if extension not in _STREAM_PARSERS:
         raise ValueError(f"Unsupported file format: {filename}")
+    return extension
+
+
+
+@contextmanager
+def _open_mapped(path: str):
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            # mmap refuses zero-length files
+            yield io.BytesIO(b"")
+            return
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+
+def parse_txt(content: bytes) -> str:
+    return content.decode('utf-8')
+
+
+
+def _parse_txt_stream(stream, source) -> str:
+    return stream.read().decode('utf-8')
 
 
 
 def parse_pdf(content: bytes) -> str:
+    return _parse_pdf_stream(io.BytesIO(content), content)
+
+
+
+def _parse_pdf_stream(stream, source: Union[bytes, str]) -> str:
+    import PyPDF2
+    
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+        pdf_reader = PyPDF2.PdfReader(stream)
+        page_count = len(pdf_reader.pages)
+        if page_count > MAX_PDF_PAGES:
+            raise DocumentTooLargeError(f"PDF has {page_count} pages, the limit is {MAX_PDF_PAGES}")
+        
+        if page_count >= PDF_PARALLEL_MIN_PAGES and PARSE_WORKERS > 1 and not _in_parse_worker:
+            # Workers get the spool path when there is one, so only bytes-only callers pay for pickling the content
+            ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count)) for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+            chunks = _get_parse_pool().map(_extract_pdf_range, [source] * len(ranges), *zip(*ranges))
+            return "".join(chunks)
+        
+        return "".join(_iter_pdf_pages(pdf_reader, 0, page_count))
+    except DocumentTooLargeError:
+        raise
     except Exception as e:
         raise ValueError(f"Error parsing PDF: {str(e)}")
 
 
 
+def _iter_pdf_pages(pdf_reader, start: int, end: int) -> Iterator[str]:
+    for index in range(start, end):
+        yield pdf_reader.pages[index].extract_text() or ""
+
+
+
+def _extract_pdf_range(source: Union[bytes, str], start: int, end: int) -> str:
+    # Runs in a worker process: each opens its own reader and extracts one page range
+    import PyPDF2
+    if isinstance(source, str):
+        with _open_mapped(source) as stream:
+            return "".join(_iter_pdf_pages(PyPDF2.PdfReader(stream), start, end))
+    return "".join(_iter_pdf_pages(PyPDF2.PdfReader(io.BytesIO(source)), start, end))
+
+
+
+def list_archive_members(zip_path: str, max_files: int, max_total_bytes: int) -> List[str]:
+    # Only supported documents, skipping folders and macOS metadata. The declared uncompressed
+    # sizes are totalled up front so a zip bomb is rejected before anything is decompressed;
+    # parse_archive_member still checks each member against the per-document limit.
+    with zipfile.ZipFile(zip_path) as archive:
+        members = []
+        total_bytes = 0
+        for info in archive.infolist():
+            name = info.filename
+            basename = os.path.basename(name)
+            if info.is_dir() or name.startswith('__MACOSX/') or not basename or basename.startswith('.'):
+                continue
+            if os.path.splitext(basename.lower())[1] not in _STREAM_PARSERS:
+                continue
+            members.append(name)
+            total_bytes += info.file_size
+        if len(members) > max_files:
+            raise DocumentTooLargeError(f"Archive contains {len(members)} documents, the limit is {max_files}")
+        if total_bytes > max_total_bytes:
+            raise DocumentTooLargeError(
+                f"Archive expands to {total_bytes / (1024 * 1024):.1f} MB, the limit is {max_total_bytes / (1024 * 1024):g} MB"
+            )
+        return members
+
+
+
+def parse_archive_member(zip_path: str, member: str) -> Dict[str, Any]:
+    # Runs in a worker process: opens the spooled archive by path and parses one member
+    started = time.perf_counter()
+    result = {"filename": member}
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            info = archive.getinfo(member)
+            if info.file_size > MAX_DOCUMENT_BYTES:
+                raise DocumentTooLargeError(f"File is larger than the {MAX_DOCUMENT_BYTES / (1024 * 1024):g} MB limit")
+            content = archive.read(member)
+        result["text"] = parse_document(content, os.path.basename(member))
+    except Exception as e:
+        result["error"] = str(e)
+    result["parse_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+
+def get_parse_executor() -> ProcessPoolExecutor:
+    return _get_parse_pool()
+
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=process_pool_context(),
+                                              initializer=_mark_parse_worker)
+        return _parse_pool
+
+
+
+def _mark_parse_worker() -> None:
+    global _in_parse_worker
+    _in_parse_worker = True
+
+
+
+def discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    # A worker that dies (e.g. killed on a hostile file) breaks the whole executor for good;
+    # dropping it lets the next caller start a fresh pool. Only the broken pool is replaced.
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+
+
+
 def parse_docx(content: bytes) -> str:
+    return _parse_docx_stream(io.BytesIO(content), content)
+
+
+
+def _parse_docx_stream(stream, source) -> str:
+    from docx import Document
+    
     try:
-        doc = Document(io.BytesIO(content))
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
+        doc = Document(stream)
+        return "".join(para.text + "\n" for para in doc.paragraphs)
     except Exception as e:
         raise ValueError(f"Error parsing DOCX: {str(e)}")
 
 
 
+# Every matchable surface form (canonical names and synonyms) from the shared taxonomy
+SKILLS_KEYWORDS = list(SKILL_TAXONOMY.surface_forms)
+
+
+
+def _compile_skill_pattern(skills: List[str]) -> Pattern:
+    # Lookarounds instead of \b because skills like 'c++', 'c#' and 'next.js' end in non-word characters.
+    return re.compile(rf'(?<![\w])(?:{_trie_regex(skills)})(?![\w])', re.IGNORECASE)
+
+
+
+def _trie_regex(skills: List[str]) -> str:
+    # Fold the keywords into a character trie so the regex engine follows one branch per
+    # character instead of retrying every alternative; cost stays flat as the taxonomy grows.
+    trie = {}
+    for skill in skills:
+        node = trie
+        for char in skill.lower():
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _trie_node_regex(trie)
+
+
+
+def _trie_node_regex(node: Dict[str, dict]) -> str:
+    branches = [re.escape(char) + _trie_node_regex(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # A complete skill ends here; the longer continuation is tried first (greedy '?')
+        body = '(?:' + body + ')?' if len(branches) == 1 else body + '?'
+    return body
+
+
+
+def _compile_nested_skills(skills: List[str]) -> Dict[str, List[Tuple[str, int]]]:
+    # Multi-word skills consume their match, so record which shorter skills they contain
+    # ('github actions' -> 'github') and report those too without a second scan.
+    known = set(skills)
+    nested = {}
+    for skill in skills:
+        starts = [i for i in range(len(skill)) if i == 0 or not _is_word_char(skill[i - 1])]
+        ends = [j for j in range(1, len(skill) + 1) if j == len(skill) or not _is_word_char(skill[j])]
+        inner = [(skill[i:j], i) for i in starts for j in ends if j > i and skill[i:j] != skill and skill[i:j] in known]
+        if inner:
+            nested[skill] = inner
+    return nested
+
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+
+_SKILL_PATTERN = _compile_skill_pattern(SKILLS_KEYWORDS)
+_NESTED_SKILLS = _compile_nested_skills(SKILLS_KEYWORDS)
+
+
+
+_STREAM_PARSERS = {
+    '.pdf': _parse_pdf_stream,
+    '.docx': _parse_docx_stream,
+    '.txt': _parse_txt_stream,
+}
+
+
+
+def extract_skill_spans(text: str) -> List[Tuple[str, int, int]]:
+    # Spans cover the text as written; skills are reported by canonical name ('k8s' -> 'kubernetes')
+    canonical = SKILL_TAXONOMY.surface_forms
+    spans = []
+    for match in _SKILL_PATTERN.finditer(text):
+        surface = match.group(0).lower()
+        spans.append((canonical[surface], match.start(), match.end()))
+        for inner, offset in _NESTED_SKILLS.get(surface, []):
+            spans.append((canonical[inner], match.start() + offset, match.start() + offset + len(inner)))
+    return spans
+
+
+
 def extract_skills(text: str) -> list:
-    skills_keywords = [
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'php', 'golang', 'rust',
-        'react', 'vue', 'angular', 'svelte', 'next.js', 'nuxt', 'express', 'django', 'flask', 'fastapi',
-        'sql', 'mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch',
-        'docker', 'kubernetes', 'aws', 'gcp', 'azure', 'heroku',
-        'git', 'github', 'gitlab', 'bitbucket',
-        'html', 'css', 'sass', 'tailwind',
-        'rest', 'graphql', 'websocket',
-        'machine learning', 'deep learning', 'nlp', 'computer vision',
-        'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-        'agile', 'scrum', 'jira', 'confluence',
-        'ci/cd', 'jenkins', 'github actions', 'gitlab ci',
-        'linux', 'windows', 'macos',
-        'api', 'microservices', 'serverless', 'lambda',
-        'testing', 'jest', 'pytest', 'mocha', 'unittest',
-        'communication', 'leadership', 'teamwork', 'problem-solving'
-    ]
-    
-    text_lower = text.lower()
-    found_skills = []
-    
-    for skill in skills_keywords:
-        if skill in text_lower:
-            found_skills.append(skill)
-    return list(set(found_skills))
+    found_skills = {}
+    for skill, _, _ in extract_skill_spans(text):
+        found_skills.setdefault(skill, None)
+    return list(found_skills)
 
 
 
@@ -0,0 +1,271 @@
+from typing import Any, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+# Heavy runtimes (torch, sentence-transformers, onnxruntime/optimum) are imported inside load()
+# so the API starts fast and only the configured backend's dependencies need to be installed.
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+class EmbeddingBackend(ABC):
+    variant = "base"
+
+    def __init__(self, model_name: str, batch_size: int = 32):
+        self.model_name = model_name
+        # Texts per forward pass: chunked batch scoring can hand over thousands of chunks at once,
+        # and bounded batches keep activation memory flat and let padding follow similar lengths
+        self.batch_size = max(batch_size, 1)
+        self.load_seconds: Optional[float] = None
+
+
+
+    @property
+    def cache_namespace(self) -> str:
+        # Different numerics give different vectors, so each variant gets its own cache entries
+        return f"{self.model_name}@{self.variant}"
+
+
+
+    def load(self) -> "EmbeddingBackend":
+        started = time.perf_counter()
+        self._load()
+        self.load_seconds = round(time.perf_counter() - started, 3)
+        return self
+
+
+
+    @abstractmethod
+    def _load(self) -> None:
+        pass
+
+
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        pass
+
+
+
+    def info(self) -> Dict[str, Any]:
+        return {"variant": self.variant, "model": self.model_name, "batch_size": self.batch_size, "load_seconds": self.load_seconds}
+
+
+
+class TorchBackend(EmbeddingBackend):
+    variant = "torch-fp32"
+
+    def __init__(self, model_name: str, num_threads: Optional[int] = None, batch_size: int = 32):
+        super().__init__(model_name, batch_size)
+        self.num_threads = num_threads
+        self.model = None
+
+
+
+    def _load(self) -> None:
+        import torch
+        from sentence_transformers import SentenceTransformer
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        self.model = SentenceTransformer(self.model_name, device="cpu")
+
+
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        # sentence-transformers sorts by length and runs batch_size texts per forward pass
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+
+
+class QuantizedTorchBackend(TorchBackend):
+    variant = "torch-int8"
+
+    def _load(self) -> None:
+        super()._load()
+        import torch
+        # Dynamic quantization: Linear weights stored as int8, activations quantized per batch.
+        # In place, so the fp32 weights are released instead of held alongside the copy.
+        torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+
+class OnnxBackend(EmbeddingBackend):
+    variant = "onnx"
+
+    def __init__(self, model_name: str, export_dir: Optional[str] = None, max_length: int = 256, batch_size: int = 32):
+        super().__init__(model_name, batch_size)
+        self.export_dir = export_dir
+        self.max_length = max_length
+        self.model = None
+        self.tokenizer = None
+
+
+
+    def _load(self) -> None:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        repo_id = self.model_name if "/" in self.model_name else f"sentence-transformers/{self.model_name}"
+        if self.export_dir and os.path.exists(os.path.join(self.export_dir, "model.onnx")):
+            self.model = ORTModelForFeatureExtraction.from_pretrained(self.export_dir)
+            self.tokenizer = AutoTokenizer.from_pretrained(self.export_dir)
+            return
+
+        # First run: export the transformer graph, and keep the export so restarts skip it
+        self.model = ORTModelForFeatureExtraction.from_pretrained(repo_id, export=True)
+        self.tokenizer = AutoTokenizer.from_pretrained(repo_id)
+        if self.export_dir:
+            self.model.save_pretrained(self.export_dir)
+            self.tokenizer.save_pretrained(self.export_dir)
+
+
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Same batching as sentence-transformers: sort by length so each batch pads to similar sizes
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        batches = [
+            self._encode_batch([texts[index] for index in order[start:start + self.batch_size]])
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        vectors = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        vectors[order] = np.concatenate(batches)
+        return vectors
+
+
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        inputs = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        outputs = self.model(**inputs)
+        hidden = np.asarray(outputs.last_hidden_state, dtype=np.float32)
+
+        # Same head as the sentence-transformers pipeline: masked mean pooling, then L2 normalisation
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+
+
+def create_embedding_backend(name: str, model_name: str) -> EmbeddingBackend:
+    num_threads = int(os.getenv("EMBEDDING_NUM_THREADS") or 0) or None
+    batch_size = int(os.getenv("EMBEDDING_ENCODE_BATCH_SIZE") or 32)
+    if name == "torch":
+        return TorchBackend(model_name, num_threads=num_threads, batch_size=batch_size)
+    if name == "torch-int8":
+        return QuantizedTorchBackend(model_name, num_threads=num_threads, batch_size=batch_size)
+    if name == "onnx":
+        return OnnxBackend(model_name, export_dir=os.getenv("EMBEDDING_ONNX_PATH") or None, batch_size=batch_size)
+    raise ValueError(f"Unsupported embedding backend: {name}")
+
+
+
+def load_embedding_backend(model_name: str, name: Optional[str] = None) -> EmbeddingBackend:
+    # The configured backend, falling back to fp32 PyTorch when its runtime is missing or fails.
+    # An ImportError from the fallback itself propagates: then there is no semantic model at all.
+    name = name or os.getenv("EMBEDDING_BACKEND", "torch")
+    backend = create_embedding_backend(name, model_name)
+    if name == "torch":
+        return backend.load()
+    try:
+        return backend.load()
+    except Exception as e:
+        print(f"Warning: Could not load {name} embedding backend, falling back to torch: {e}")
+        return create_embedding_backend("torch", model_name).load()
+
+
+
+# Resume/JD sentence pairs spanning strong, partial and no overlap, for accuracy checks
+FIXTURE_PAIRS: List[Tuple[str, str]] = [
+    ("Built REST APIs in Python with FastAPI and PostgreSQL", "Backend engineer with Python web framework experience"),
+    ("Led migration of services to Kubernetes on AWS", "Experience operating containers on a cloud platform"),
+    ("Designed React dashboards with TypeScript", "Frontend developer skilled in modern JavaScript frameworks"),
+    ("Trained gradient boosted models for churn prediction", "Machine learning engineer for customer analytics"),
+    ("Managed a team of five engineers and ran sprint planning", "Engineering manager with agile delivery experience"),
+    ("Wrote Terraform modules and GitHub Actions pipelines", "DevOps engineer familiar with infrastructure as code and CI/CD"),
+    ("Tuned slow SQL queries and added indexes", "Database performance optimisation"),
+    ("Taught high school chemistry for six years", "Senior Go developer for distributed systems"),
+    ("Barista experienced in latte art and customer service", "Data engineer building Spark pipelines"),
+    ("Published research on computer vision for medical imaging", "Deep learning engineer working on image segmentation"),
+    ("Maintained Java Spring Boot microservices", "Backend developer with JVM experience"),
+    ("Organised community events and volunteer schedules", "Kubernetes platform reliability engineer"),
+]
+
+
+def accuracy_check(candidate: EmbeddingBackend, reference: EmbeddingBackend, pairs: List[Tuple[str, str]],
+                   repeats: int = 5) -> Dict[str, Any]:
+    texts = [text for pair in pairs for text in pair]
+
+    def timed_encode(backend: EmbeddingBackend) -> Tuple[np.ndarray, float]:
+        backend.encode(texts)
+        started = time.perf_counter()
+        for _ in range(repeats):
+            vectors = backend.encode(texts)
+        return _normalize(vectors), (time.perf_counter() - started) / repeats
+
+    reference_vectors, reference_seconds = timed_encode(reference)
+    candidate_vectors, candidate_seconds = timed_encode(candidate)
+
+    reference_scores = np.sum(reference_vectors[0::2] * reference_vectors[1::2], axis=1)
+    candidate_scores = np.sum(candidate_vectors[0::2] * candidate_vectors[1::2], axis=1)
+    drift = np.abs(candidate_scores - reference_scores)
+    agreement = np.sum(candidate_vectors * reference_vectors, axis=1)
+
+    return {
+        "reference": reference.info(),
+        "candidate": candidate.info(),
+        "pairs": len(pairs),
+        "max_score_drift": round(float(drift.max()), 5),
+        "mean_score_drift": round(float(drift.mean()), 5),
+        "min_vector_cosine_to_reference": round(float(agreement.min()), 5),
+        "reference_encode_ms": round(reference_seconds * 1000, 2),
+        "candidate_encode_ms": round(candidate_seconds * 1000, 2),
+        "speedup": round(reference_seconds / candidate_seconds, 2) if candidate_seconds else None
+    }
+
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+
+def _load_pairs(path: str) -> List[Tuple[str, str]]:
+    # JSONL with "resume" and "job_description" fields per line
+    with open(path, encoding="utf-8") as handle:
+        return [(row["resume"], row["job_description"]) for row in map(json.loads, filter(str.strip, handle))]
+
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Embedding backend tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = subparsers.add_parser("check", help="Compare a backend's similarity scores against fp32 PyTorch")
+    check_parser.add_argument("--backend", choices=BACKENDS, default="torch-int8")
+    check_parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    check_parser.add_argument("--pairs", help="JSONL fixture pairs; defaults to the built-in set")
+    check_parser.add_argument("--max-drift", type=float, default=0.03, help="Fail when any pair's cosine moves more than this")
+    check_parser.add_argument("--repeats", type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    pairs = _load_pairs(args.pairs) if args.pairs else FIXTURE_PAIRS
+    reference = create_embedding_backend("torch", args.model).load()
+    candidate = create_embedding_backend(args.backend, args.model).load()
+    report = accuracy_check(candidate, reference, pairs, repeats=args.repeats)
+    report["max_drift_allowed"] = args.max_drift
+    report["passed"] = report["max_score_drift"] <= args.max_drift
+
+    print(json.dumps(report, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Tuple
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+from .metrics import REGISTRY, record_stage
+
+BATCH_SIZE = REGISTRY.histogram(
+    "careercompass_embedding_batch_size", "Texts per batched model encode", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+BATCH_WAIT_SECONDS = REGISTRY.histogram(
+    "careercompass_embedding_batch_wait_seconds", "Time a request waited for its batch to start",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+
+class EmbeddingBatcher:
+    # Micro-batches encode calls from concurrent analyses: one worker thread takes the first
+    # waiting request, gathers more for up to max_wait or max_batch_size texts, runs a single
+    # batched encode and hands each caller back its own rows.
+    def __init__(self, encode_fn: Callable[[List[str]], Any], max_batch_size: int = 32, max_wait_ms: float = 5,
+                 max_queue: int = 256, timeout_seconds: float = 30):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._queue: "queue.Queue[Tuple[List[str], Future, float]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._pending: "set[Future]" = set()
+        self._closed = False
+
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+
+
+    @classmethod
+    def from_env(cls, encode_fn: Callable[[List[str]], Any]) -> "EmbeddingBatcher":
+        return cls(
+            encode_fn,
+            max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+            max_wait_ms=float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5")),
+            max_queue=int(os.getenv("EMBEDDING_BATCH_QUEUE", "256")),
+            timeout_seconds=float(os.getenv("EMBEDDING_BATCH_TIMEOUT_SECONDS", "30"))
+        )
+
+
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Embedding batcher is closed")
+            self._waiting += 1
+            self._pending.add(future)
+        try:
+            deadline = time.perf_counter() + self.timeout_seconds
+            # A full queue blocks the caller: backpressure rather than dropping work
+            try:
+                self._queue.put((list(texts), future, time.perf_counter()), timeout=self.timeout_seconds)
+                vectors, wait_seconds, model_seconds = future.result(timeout=max(deadline - time.perf_counter(), 0))
+            except (queue.Full, FutureTimeoutError):
+                # Cancelling keeps the worker from encoding it later; a batch already running
+                # just finishes without anyone reading the result
+                future.cancel()
+                raise TimeoutError(f"Embedding batch did not complete within {self.timeout_seconds}s")
+            except CancelledError:
+                raise RuntimeError("Embedding batcher is closed")
+            # Model time is measured on the worker thread, which has no request context of its own
+            record_stage("embedding_queue", wait_seconds)
+            record_stage("embedding_model", model_seconds)
+            return vectors
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                self._pending.discard(future)
+
+
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._drain()
+                return
+
+            batch = [first]
+            size = len(first[0])
+            closing = False
+            deadline = time.perf_counter() + self.max_wait_seconds
+            # Only wait while other callers are actually queued up: a lone request is encoded
+            # immediately instead of paying max_wait for a batch that will never fill
+            while size < self.max_batch_size:
+                with self._lock:
+                    others_pending = self._waiting > len(batch)
+                remaining = deadline - time.perf_counter()
+                if not others_pending or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self._encode_batch(batch)
+            if closing:
+                self._drain()
+                return
+
+
+
+    def _drain(self) -> None:
+        # close() has already cancelled these; emptying the queue frees any caller blocked on put
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+
+    def _encode_batch(self, batch: List[Tuple[List[str], Future, float]]) -> None:
+        # Requests cancelled by a timeout or close() are dropped; the rest can no longer be cancelled
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        texts = [text for request_texts, _, _ in batch for text in request_texts]
+        BATCH_SIZE.observe(len(texts))
+        for _, _, enqueued_at in batch:
+            BATCH_WAIT_SECONDS.observe(started - enqueued_at)
+
+        try:
+            vectors = np.asarray(self.encode_fn(texts), dtype=np.float32)
+        except BaseException as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        model_seconds = time.perf_counter() - started
+
+        offset = 0
+        for request_texts, future, enqueued_at in batch:
+            future.set_result((vectors[offset:offset + len(request_texts)], started - enqueued_at, model_seconds))
+            offset += len(request_texts)
+
+        with self._lock:
+            self.batches += 1
+            self.items += len(texts)
+            self.requests += len(batch)
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queue.qsize(),
+                "waiting": self._waiting,
+                "batches": self.batches,
+                "requests": self.requests,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+            }
+
+
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pending = list(self._pending)
+        # Waiting callers fail now instead of blocking on a worker that is shutting down; a batch
+        # already in the model still completes for its callers
+        for future in pending:
+            future.cancel()
+        self._queue.put(None)
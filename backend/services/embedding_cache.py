@@ -0,0 +1,190 @@
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from collections import OrderedDict
+import hashlib
+import sqlite3
+import threading
+import re
+import os
+import numpy as np
+
+
+# Stays under SQLite's default limit on bound parameters per statement
+DISK_LOOKUP_CHUNK = 500
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        # SQLite work happens under its own lock, never while the in-memory LRU is held
+        self._disk_lock = threading.Lock()
+        self._db = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_path:
+            try:
+                self._db = self._open_disk_tier(disk_path)
+            except Exception as e:
+                print(f"Warning: Could not open embedding cache at {disk_path}: {e}")
+                self._db = None
+
+
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingCache":
+        return cls(
+            max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+            disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None
+        )
+
+
+
+    def _open_disk_tier(self, path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+        )
+        db.commit()
+        return db
+
+
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        normalized = re.sub(r'\s+', ' ', text).strip()
+        return hashlib.sha256(f"{model_name}\x00{normalized}".encode('utf-8')).hexdigest()
+
+
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self.get_many([key])[0]
+
+
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        vectors: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                vectors.append(vector)
+
+        missing = list(dict.fromkeys(key for key, vector in zip(keys, vectors) if vector is None))
+        found = self._read_disk(missing) if missing else {}
+
+        with self._lock:
+            for key, vector in found.items():
+                self._remember(key, vector)
+            for index, key in enumerate(keys):
+                if vectors[index] is not None:
+                    continue
+                vectors[index] = found.get(key)
+                if vectors[index] is not None:
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+        return vectors
+
+
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        self.put_many([(key, vector)])
+
+
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        items = [(key, np.asarray(vector, dtype=np.float32)) for key, vector in items]
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+        # One transaction for the whole batch rather than a commit per vector
+        with self._disk_lock:
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                    [(key, int(vector.shape[0]), vector.tobytes()) for key, vector in items]
+                )
+                self._db.commit()
+
+
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._disk_lock:
+            if self._db is None:
+                return found
+            for start in range(0, len(keys), DISK_LOOKUP_CHUNK):
+                chunk = keys[start:start + DISK_LOOKUP_CHUNK]
+                rows = self._db.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, dim, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).reshape(dim)
+        return found
+
+
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        vector.setflags(write=False)
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+
+    def encode(self, model_name: str, texts: List[str], encode_fn: Callable[[List[str]], Any]) -> np.ndarray:
+        keys = [self.make_key(model_name, text) for text in texts]
+        vectors = self.get_many(keys)
+
+        # Only the misses reach the model, deduplicated and encoded as one batch
+        missing: Dict[str, int] = {}
+        for index, vector in enumerate(vectors):
+            if vector is None and keys[index] not in missing:
+                missing[keys[index]] = index
+
+        if missing:
+            encoded = np.asarray(encode_fn([texts[index] for index in missing.values()]), dtype=np.float32)
+            fresh = dict(zip(missing.keys(), encoded))
+            self.put_many(list(fresh.items()))
+            vectors = [vector if vector is not None else fresh[key] for key, vector in zip(keys, vectors)]
+
+        return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_enabled": self._db is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+
+
+    def close(self) -> None:
+        with self._disk_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,380 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import os
+import threading
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: flushes are not coordinated across processes, so run a single worker there
+    fcntl = None
+
+# Below this many tombstones an in-memory index is not worth compacting
+COMPACT_MIN_TOMBSTONES = 256
+
+
+class JobIndex:
+    def __init__(self, storage_dir: Optional[str] = None, semantic_weight: float = 0.7, compact_ratio: float = 0.5):
+        self.storage_dir = storage_dir
+        self.semantic_weight = semantic_weight
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        # Serialises flushes, which do their disk I/O without holding _lock
+        self._flush_lock = threading.Lock()
+
+        self._matrix: Optional[np.ndarray] = None
+        self._count = 0
+        self._jobs: List[Dict[str, Any]] = []
+        self._active = np.zeros(0, dtype=bool)
+        self._skill_counts = np.zeros(0, dtype=np.int32)
+        self._id_to_row: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._posting_arrays: Dict[str, np.ndarray] = {}
+        # Changes since the last flush, merged into the shared files: (job_id, job or None for a removal, embedding)
+        self._pending: List[Tuple[str, Optional[Dict[str, Any]], Optional[np.ndarray]]] = []
+        self._loaded_version = None
+
+        if storage_dir:
+            with self._file_lock(exclusive=False):
+                self._load()
+
+
+
+    @classmethod
+    def from_env(cls) -> "JobIndex":
+        return cls(
+            storage_dir=os.getenv("JOB_INDEX_PATH") or None,
+            semantic_weight=float(os.getenv("JOB_INDEX_SEMANTIC_WEIGHT", "0.7")),
+            compact_ratio=float(os.getenv("JOB_INDEX_COMPACT_RATIO", "0.5"))
+        )
+
+
+
+    @property
+    def size(self) -> int:
+        return len(self._id_to_row)
+
+
+
+    def _paths(self) -> Tuple[str, str]:
+        return os.path.join(self.storage_dir, "embeddings.npy"), os.path.join(self.storage_dir, "jobs.json")
+
+
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        # Shared for loads, exclusive for flushes, so no worker reads the two files mid-rewrite
+        os.makedirs(self.storage_dir, exist_ok=True)
+        with open(os.path.join(self.storage_dir, "index.lock"), "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+
+
+    def _disk_version(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self._paths()[1])
+        except FileNotFoundError:
+            return None
+        # Every flush replaces the file, so a new inode or mtime means another worker wrote it
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+
+    def _read_disk(self) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray]]:
+        matrix_path, jobs_path = self._paths()
+        if not (os.path.exists(matrix_path) and os.path.exists(jobs_path)):
+            return [], None
+
+        with open(jobs_path, encoding="utf-8") as handle:
+            jobs = json.load(handle)
+        if not jobs:
+            return [], None
+        # Read-only memory map: the OS pages embeddings in on demand, and every worker mapping
+        # the same file shares those pages instead of holding its own copy
+        return jobs, np.load(matrix_path, mmap_mode="r")
+
+
+
+    def _load(self) -> None:
+        self._install(self._read_state())
+
+
+
+    def _read_state(self) -> Dict[str, Any]:
+        version = self._disk_version()
+        jobs, matrix = self._read_disk()
+        return {
+            "version": version,
+            "matrix": matrix,
+            "jobs": jobs,
+            "skill_counts": np.array([len(job["skills"]) for job in jobs], dtype=np.int32)
+        }
+
+
+
+    def _install(self, state: Dict[str, Any]) -> None:
+        self._loaded_version = state["version"]
+        self._matrix = state["matrix"]
+        self._jobs = state["jobs"]
+        self._count = len(self._jobs)
+        self._active = np.ones(self._count, dtype=bool)
+        self._skill_counts = state["skill_counts"]
+        self._id_to_row = {job["job_id"]: row for row, job in enumerate(self._jobs)}
+        self._rebuild_postings()
+
+
+
+    def _rebuild_postings(self) -> None:
+        self._postings = {}
+        self._posting_arrays = {}
+        for row, job in enumerate(self._jobs[:self._count]):
+            if self._active[row]:
+                for skill in job["skills"]:
+                    self._postings.setdefault(skill, []).append(row)
+
+
+
+    def _ensure_capacity(self, needed: int, dimension: int) -> None:
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        writable = self._matrix is not None and not isinstance(self._matrix, np.memmap)
+        if writable and capacity >= needed:
+            return
+
+        new_capacity = max(needed, capacity * 2, 1024)
+        matrix = np.zeros((new_capacity, dimension), dtype=np.float32)
+        if self._count:
+            matrix[:self._count] = self._matrix[:self._count]
+        self._matrix = matrix
+
+        active = np.zeros(new_capacity, dtype=bool)
+        active[:self._count] = self._active[:self._count]
+        self._active = active
+
+        skill_counts = np.zeros(new_capacity, dtype=np.int32)
+        skill_counts[:self._count] = self._skill_counts[:self._count]
+        self._skill_counts = skill_counts
+
+
+
+    def add(self, job_id: str, title: Optional[str], embedding: np.ndarray, skills: List[str], excerpt: str = "") -> None:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        job = {"job_id": job_id, "title": title, "skills": list(skills), "excerpt": excerpt}
+        with self._lock:
+            if self._matrix is not None and self._matrix.size and self._matrix.shape[1] != embedding.shape[0]:
+                raise ValueError(f"Embedding dimension {embedding.shape[0]} does not match index dimension {self._matrix.shape[1]}")
+
+            self._apply(job_id, job, embedding)
+            if self.storage_dir:
+                self._pending.append((job_id, job, embedding))
+            self._maybe_compact()
+
+
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            removed = self._deactivate(job_id)
+            if removed:
+                if self.storage_dir:
+                    self._pending.append((job_id, None, None))
+                self._maybe_compact()
+            return removed
+
+
+
+    def _apply(self, job_id: str, job: Optional[Dict[str, Any]], embedding: Optional[np.ndarray]) -> None:
+        # Re-adding an id replaces the posting: the old row is tombstoned until the next flush or compaction
+        self._deactivate(job_id)
+        if job is None:
+            return
+
+        self._ensure_capacity(self._count + 1, embedding.shape[0])
+        row = self._count
+        self._matrix[row] = embedding
+        self._active[row] = True
+        self._skill_counts[row] = len(job["skills"])
+        self._jobs.append(job)
+        self._id_to_row[job_id] = row
+        for skill in job["skills"]:
+            self._postings.setdefault(skill, []).append(row)
+            self._posting_arrays.pop(skill, None)
+        self._count += 1
+
+
+
+    def _maybe_compact(self) -> None:
+        # Persistent indexes drop tombstones when a flush rewrites the files; an in-memory one never
+        # flushes, so once tombstones pass compact_ratio of the rows the live rows are copied out.
+        # Everything is rebuilt as new objects, so a search working on a snapshot is unaffected.
+        tombstones = self._count - len(self._id_to_row)
+        if self.storage_dir or tombstones < COMPACT_MIN_TOMBSTONES or tombstones <= self.compact_ratio * self._count:
+            return
+
+        rows = np.flatnonzero(self._active[:self._count])
+        self._matrix = self._matrix[rows]
+        self._skill_counts = self._skill_counts[rows]
+        self._jobs = [self._jobs[row] for row in rows]
+        self._count = len(rows)
+        self._active = np.ones(self._count, dtype=bool)
+        self._id_to_row = {job["job_id"]: row for row, job in enumerate(self._jobs)}
+        self._rebuild_postings()
+
+
+
+    def _deactivate(self, job_id: str) -> bool:
+        row = self._id_to_row.pop(job_id, None)
+        if row is None:
+            return False
+        self._active[row] = False
+        return True
+
+
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._id_to_row.get(job_id)
+            return dict(self._jobs[row]) if row is not None else None
+
+
+
+    def _posting_array(self, skill: str) -> Optional[np.ndarray]:
+        array = self._posting_arrays.get(skill)
+        if array is None and skill in self._postings:
+            array = np.array(self._postings[skill], dtype=np.int64)
+            self._posting_arrays[skill] = array
+        return array
+
+
+
+    def search(self, query_embedding: np.ndarray, query_skills: List[str], top_k: int = 10, min_skill_overlap: int = 1) -> List[Dict[str, Any]]:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        unique_skills = set(query_skills)
+        # Only the snapshot is taken under the lock. Rows below count are never rewritten in place
+        # (adds append, compaction and reloads build new arrays), so the dense product runs unlocked.
+        with self._lock:
+            count = self._count
+            if count == 0 or not self._id_to_row:
+                return []
+
+            matrix = self._matrix
+            jobs = self._jobs
+            skill_counts = self._skill_counts
+            active = self._active[:count].copy()
+            overlap = np.zeros(count, dtype=np.int32)
+            for skill in unique_skills:
+                rows = self._posting_array(skill)
+                if rows is not None:
+                    np.add.at(overlap, rows, 1)
+
+        # Skill prefilter: only postings sharing enough skills reach the dense scoring step.
+        # If that leaves fewer than top_k jobs, widen to every active posting.
+        candidates = np.flatnonzero(active & (overlap >= min_skill_overlap)) if min_skill_overlap > 0 else np.flatnonzero(active)
+        if len(candidates) < top_k:
+            candidates = np.flatnonzero(active)
+        if len(candidates) == 0:
+            return []
+
+        semantic = matrix[candidates] @ query
+        coverage = overlap[candidates] / np.maximum(skill_counts[candidates], 1)
+        scores = self.semantic_weight * semantic + (1 - self.semantic_weight) * coverage
+
+        k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for position in top:
+            row = int(candidates[position])
+            job = jobs[row]
+            results.append({
+                "job_id": job["job_id"],
+                "title": job["title"],
+                "score": round(float(scores[position]), 4),
+                "semantic_similarity": round(float(semantic[position]), 4),
+                "skill_overlap": int(overlap[row]),
+                "matched_skills": [skill for skill in job["skills"] if skill in unique_skills],
+                "missing_skills": [skill for skill in job["skills"] if skill not in unique_skills],
+                "excerpt": job["excerpt"]
+            })
+        return results
+
+
+
+    def flush(self) -> bool:
+        # Workers sharing storage_dir each merge their own pending changes into the current files
+        # under an exclusive lock, so one worker's flush never drops another's additions. Every
+        # flush, including one with nothing pending, then reloads the merged files: other workers'
+        # changes show up here and the vectors return to the shared memory map.
+        if not self.storage_dir:
+            return False
+
+        with self._flush_lock:
+            version = self._disk_version()
+            with self._lock:
+                pending = list(self._pending)
+                if not pending and version == self._loaded_version:
+                    return False
+
+            # Writing and reloading happen outside _lock so searches and adds are not held up by disk I/O
+            with self._file_lock(exclusive=bool(pending)):
+                if pending:
+                    self._write_merged(pending)
+                state = self._read_state()
+
+            with self._lock:
+                # Changes made while the files were being written are not in them yet: keep them
+                # pending and replay them onto the reloaded state
+                later = self._pending[len(pending):]
+                self._install(state)
+                self._pending = later
+                for job_id, job, embedding in later:
+                    self._apply(job_id, job, embedding)
+            return True
+
+
+
+    def _write_merged(self, pending: List[Tuple[str, Optional[Dict[str, Any]], Optional[np.ndarray]]]) -> None:
+        disk_jobs, disk_matrix = self._read_disk()
+        merged: "OrderedDict[str, Tuple[Dict[str, Any], np.ndarray]]" = OrderedDict(
+            (job["job_id"], (job, disk_matrix[row])) for row, job in enumerate(disk_jobs)
+        )
+        for job_id, job, embedding in pending:
+            merged.pop(job_id, None)
+            if job is not None:
+                merged[job_id] = (job, embedding)
+
+        jobs = [job for job, _ in merged.values()]
+        vectors = [vector for _, vector in merged.values()]
+        if len({vector.shape for vector in vectors}) > 1:
+            raise ValueError("Job index embeddings on disk and in this worker have different dimensions")
+        matrix = np.stack(vectors).astype(np.float32, copy=False) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+        # Per-process temp names, then rename: readers never see a half-written file
+        matrix_path, jobs_path = self._paths()
+        suffix = f".{os.getpid()}.tmp"
+        with open(matrix_path + suffix, "wb") as handle:
+            np.save(handle, matrix)
+        with open(jobs_path + suffix, "w", encoding="utf-8") as handle:
+            json.dump(jobs, handle)
+        os.replace(matrix_path + suffix, matrix_path)
+        os.replace(jobs_path + suffix, jobs_path)
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "jobs": len(self._id_to_row),
+                "rows": self._count,
+                "tombstones": self._count - len(self._id_to_row),
+                "dimension": int(self._matrix.shape[1]) if self._matrix is not None and self._matrix.ndim == 2 else None,
+                "distinct_skills": len(self._postings),
+                "memory_mapped": isinstance(self._matrix, np.memmap),
+                "persistent": bool(self.storage_dir),
+                "dirty": bool(self._pending),
+                "pending_changes": len(self._pending)
+            }
@@ -0,0 +1,214 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import os
+
+
+class LLMResponseCache:
+    def __init__(self, ttl_seconds: float = 86400, max_entries: int = 2000, disk_path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # The disk tier has its own lock so a slow SQLite call never holds up memory-tier lookups
+        self._disk_lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.bypasses = 0
+        self.saved_latency_seconds = 0.0
+
+        if disk_path:
+            try:
+                self._db = self._open_disk_tier(disk_path)
+            except Exception as e:
+                print(f"Warning: Could not open LLM response cache at {disk_path}: {e}")
+                self._db = None
+
+
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        return cls(
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "2000")),
+            disk_path=os.getenv("LLM_CACHE_PATH") or None
+        )
+
+
+
+    def _open_disk_tier(self, path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, upstream_latency REAL NOT NULL)"
+        )
+        db.commit()
+        return db
+
+
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float) -> str:
+        return hashlib.sha256(f"{model}\x00{temperature!r}\x00{prompt}".encode('utf-8')).hexdigest()
+
+
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = self._get_disk(key)
+        if value is None:
+            self._record_miss()
+        return value
+
+
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        # Memory hits are answered on the event loop; only the SQLite lookup goes to a thread
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key)
+        if value is None:
+            self._record_miss()
+        return value
+
+
+
+    def put(self, key: str, value: Dict[str, Any], upstream_latency: float = 0.0) -> None:
+        expires_at = self._put_memory(key, value, upstream_latency)
+        if self._db is not None:
+            self._put_disk(key, value, expires_at, upstream_latency)
+
+
+
+    async def aput(self, key: str, value: Dict[str, Any], upstream_latency: float = 0.0) -> None:
+        expires_at = self._put_memory(key, value, upstream_latency)
+        if self._db is not None:
+            await asyncio.to_thread(self._put_disk, key, value, expires_at, upstream_latency)
+
+
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value, upstream_latency = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._record_hit(upstream_latency)
+                return value
+            del self._memory[key]
+            return None
+
+
+
+    def _get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._disk_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT value, expires_at, upstream_latency FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] <= now:
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+        if row is None:
+            return None
+
+        value = json.loads(row[0])
+        with self._lock:
+            self._remember(key, value, row[1], row[2])
+            self._record_hit(row[2])
+        return value
+
+
+
+    def _put_memory(self, key: str, value: Dict[str, Any], upstream_latency: float) -> float:
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, value, expires_at, upstream_latency)
+            self.stores += 1
+        return expires_at
+
+
+
+    def _put_disk(self, key: str, value: Dict[str, Any], expires_at: float, upstream_latency: float) -> None:
+        with self._disk_lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, expires_at, upstream_latency) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, upstream_latency)
+            )
+            self._db.commit()
+
+
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypasses += 1
+
+
+
+    def _record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+
+
+    def _record_hit(self, upstream_latency: float) -> None:
+        self.hits += 1
+        self.saved_latency_seconds += upstream_latency
+
+
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float, upstream_latency: float) -> None:
+        self._memory[key] = (expires_at, value, upstream_latency)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._db is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "bypasses": self.bypasses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_upstream_seconds": round(self.saved_latency_seconds, 3)
+            }
+
+
+
+    def close(self) -> None:
+        with self._disk_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,813 @@
+from typing import Any, Dict, List, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import os
+
+# Rough per-entry bookkeeping cost on top of the text itself
+_SESSION_OVERHEAD_BYTES = 512
+_MESSAGE_OVERHEAD_BYTES = 128
+
+
+class SessionBackend(ABC):
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+
+
+    @abstractmethod
+    def get_or_create(self, session_id: str) -> Dict[str, Any]:
+        pass
+
+
+
+    @abstractmethod
+    def create(self, session_id: str, resume_text: Optional[str], job_description_text: Optional[str]) -> Dict[str, Any]:
+        pass
+
+
+
+    @abstractmethod
+    def append_message(self, session_id: str, role: str, content: str) -> None:
+        pass
+
+
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        pass
+
+
+
+    @abstractmethod
+    def set_summary(self, session_id: str, summary: str, fingerprint: str) -> None:
+        pass
+
+
+
+    def sweep(self) -> int:
+        return 0
+
+
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        pass
+
+
+
+    async def run_sweeper(self, interval_seconds: float = 60) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                print(f"Warning: Session sweep failed: {e}")
+
+
+
+    def close(self) -> None:
+        pass
+
+
+
+    def _new_session(self, resume_text: Optional[str], job_description_text: Optional[str]) -> Dict[str, Any]:
+        return {
+            "messages": [],
+            "resume_text": resume_text,
+            "job_description_text": job_description_text,
+            "created_at": datetime.now().isoformat()
+        }
+
+
+
+class SessionStore(SessionBackend):
+    def __init__(self, max_sessions: int = 10000, max_bytes: int = 256 * 1024 * 1024,
+                 idle_ttl_seconds: float = 3600, max_messages_per_session: int = 200):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_messages_per_session = max_messages_per_session
+
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"lru": 0, "ttl": 0, "bytes": 0}
+        self.trimmed_messages = 0
+
+
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        return cls(
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "10000")),
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024))),
+            idle_ttl_seconds=float(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600")),
+            max_messages_per_session=int(os.getenv("SESSION_MAX_MESSAGES", "200"))
+        )
+
+
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._snapshot(session)
+
+
+
+    def get_or_create(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                self.misses += 1
+                session = self._insert(session_id, self._new_session(None, None))
+            else:
+                self.hits += 1
+            return self._snapshot(session)
+
+
+
+    def create(self, session_id: str, resume_text: Optional[str], job_description_text: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            self._remove(session_id)
+            session = self._insert(session_id, self._new_session(resume_text, job_description_text))
+            return self._snapshot(session)
+
+
+
+    def append_message(self, session_id: str, role: str, content: str) -> None:
+        with self._lock:
+            session = self._touch(session_id)
+            if session is None:
+                session = self._insert(session_id, self._new_session(None, None))
+
+            message = {"role": role, "content": content}
+            session["messages"].append(message)
+            added = self._message_size(message)
+
+            # Per-session cap: drop the oldest turns first
+            while len(session["messages"]) > self.max_messages_per_session:
+                added -= self._message_size(session["messages"].pop(0))
+                self.trimmed_messages += 1
+
+            self._sizes[session_id] += added
+            self._total_bytes += added
+            self._enforce_limits(keep=session_id)
+
+
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._remove(session_id)
+
+
+
+    def set_summary(self, session_id: str, summary: str, fingerprint: str) -> None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            added = len(summary) - len(session.get("summary") or "")
+            session["summary"] = summary
+            session["summary_fingerprint"] = fingerprint
+            self._sizes[session_id] += added
+            self._total_bytes += added
+
+
+
+    def sweep(self) -> int:
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        removed = 0
+        with self._lock:
+            # Oldest access first, so the scan stops at the first live session
+            for session_id in list(self._sessions.keys()):
+                if self._last_access[session_id] >= cutoff:
+                    break
+                self._remove(session_id)
+                self.evictions["ttl"] += 1
+                removed += 1
+        return removed
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._total_bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "max_messages_per_session": self.max_messages_per_session,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": dict(self.evictions),
+                "trimmed_messages": self.trimmed_messages
+            }
+
+
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - self._last_access[session_id] > self.idle_ttl_seconds:
+            self._remove(session_id)
+            self.evictions["ttl"] += 1
+            return None
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+        return session
+
+
+
+    def _insert(self, session_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+        size = self._session_size(session)
+        self._sessions[session_id] = session
+        self._last_access[session_id] = time.monotonic()
+        self._sizes[session_id] = size
+        self._total_bytes += size
+        self._enforce_limits(keep=session_id)
+        return session
+
+
+
+    def _remove(self, session_id: str) -> bool:
+        if self._sessions.pop(session_id, None) is None:
+            return False
+        self._last_access.pop(session_id, None)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+        return True
+
+
+
+    def _enforce_limits(self, keep: str) -> None:
+        while len(self._sessions) > self.max_sessions:
+            self._evict_oldest(keep, "lru")
+        while self._total_bytes > self.max_bytes and len(self._sessions) > 1:
+            self._evict_oldest(keep, "bytes")
+
+
+
+    def _evict_oldest(self, keep: str, reason: str) -> None:
+        for session_id in self._sessions:
+            if session_id != keep:
+                self._remove(session_id)
+                self.evictions[reason] += 1
+                return
+
+
+
+    def _session_size(self, session: Dict[str, Any]) -> int:
+        return (
+            _SESSION_OVERHEAD_BYTES
+            + len(session.get("resume_text") or "")
+            + len(session.get("job_description_text") or "")
+            + sum(self._message_size(message) for message in session["messages"])
+        )
+
+
+
+    def _message_size(self, message: Dict[str, str]) -> int:
+        return _MESSAGE_OVERHEAD_BYTES + len(message["content"])
+
+
+
+    def _snapshot(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        # Callers get a copy so they can't grow the stored session behind the accounting
+        snapshot = dict(session)
+        snapshot["messages"] = list(session["messages"])
+        return snapshot
+
+
+
+class SqliteSessionStore(SessionBackend):
+    # Shared by every worker process on one host. WAL lets readers proceed during writes: reads
+    # run in deferred transactions (one snapshot, no write lock) and only mutations take the
+    # write lock, each as a single IMMEDIATE transaction so concurrent appends never interleave.
+    def __init__(self, path: str, max_sessions: int = 100000, max_bytes: int = 1024 * 1024 * 1024,
+                 idle_ttl_seconds: float = 3600, max_messages_per_session: int = 200, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_messages_per_session = max_messages_per_session
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach them all; the generation tells threads
+        # holding a connection from before a close() to open a fresh one
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        # Request threads update the counters concurrently
+        self._stats_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"lru": 0, "ttl": 0, "bytes": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript("""
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                resume_text TEXT,
+                job_description_text TEXT,
+                created_at TEXT NOT NULL,
+                last_access REAL NOT NULL,
+                summary TEXT,
+                summary_fingerprint TEXT
+            );
+            CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id);
+            COMMIT;
+        """)
+        with self._transaction() as db:
+            columns = {row[1] for row in db.execute("PRAGMA table_info(sessions)")}
+            for column in ("summary", "summary_fingerprint"):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE sessions ADD COLUMN {column} TEXT")
+            self._create_totals(db)
+
+
+
+    def _create_totals(self, db: sqlite3.Connection) -> None:
+        # Running session count and stored text size, kept exact by triggers across every worker,
+        # so stats and the caps read one row instead of scanning both tables
+        db.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), sessions INTEGER NOT NULL, bytes INTEGER NOT NULL)")
+        if db.execute("SELECT 1 FROM totals").fetchone() is None:
+            # First start on an existing database: one scan to seed the counters
+            db.execute(
+                "INSERT INTO totals (id, sessions, bytes) VALUES (0, "
+                "(SELECT COUNT(*) FROM sessions), "
+                "(SELECT COALESCE(SUM(LENGTH(COALESCE(resume_text, '')) + LENGTH(COALESCE(job_description_text, ''))), 0) FROM sessions) + "
+                "(SELECT COALESCE(SUM(LENGTH(content)), 0) FROM messages))"
+            )
+        db.execute("""
+            CREATE TRIGGER IF NOT EXISTS totals_session_insert AFTER INSERT ON sessions BEGIN
+                UPDATE totals SET sessions = sessions + 1,
+                    bytes = bytes + LENGTH(COALESCE(NEW.resume_text, '')) + LENGTH(COALESCE(NEW.job_description_text, ''))
+                WHERE id = 0;
+            END
+        """)
+        db.execute("""
+            CREATE TRIGGER IF NOT EXISTS totals_session_delete AFTER DELETE ON sessions BEGIN
+                UPDATE totals SET sessions = sessions - 1,
+                    bytes = bytes - LENGTH(COALESCE(OLD.resume_text, '')) - LENGTH(COALESCE(OLD.job_description_text, ''))
+                WHERE id = 0;
+            END
+        """)
+        db.execute("""
+            CREATE TRIGGER IF NOT EXISTS totals_message_insert AFTER INSERT ON messages BEGIN
+                UPDATE totals SET bytes = bytes + LENGTH(NEW.content) WHERE id = 0;
+            END
+        """)
+        db.execute("""
+            CREATE TRIGGER IF NOT EXISTS totals_message_delete AFTER DELETE ON messages BEGIN
+                UPDATE totals SET bytes = bytes - LENGTH(OLD.content) WHERE id = 0;
+            END
+        """)
+
+
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.generation != self._generation:
+            # One connection per thread; autocommit mode so transactions are explicit.
+            # A short busy timeout: a contended lock fails the request instead of stalling a thread for long.
+            # check_same_thread is off only so close() can close it from another thread.
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None,
+                                 check_same_thread=False)
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            with self._connections_lock:
+                self._connections.append(db)
+                self._local.generation = self._generation
+            self._local.db = db
+        return db
+
+
+
+    def _transaction(self):
+        return _Transaction(self._connection(), "BEGIN IMMEDIATE")
+
+
+
+    def _read_transaction(self):
+        return _Transaction(self._connection(), "BEGIN")
+
+
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self._read(session_id)
+        self._record_lookup(session is not None)
+        return session
+
+
+
+    def get_or_create(self, session_id: str) -> Dict[str, Any]:
+        session = self._read(session_id)
+        self._record_lookup(session is not None)
+        if session is not None:
+            return session
+
+        with self._transaction() as db:
+            # Another worker may have created it since the read; only replace a missing or expired row
+            session = self._load(db, session_id, time.time())
+            if session is None:
+                if self._delete(db, session_id):
+                    self._record_evictions("ttl")
+                session = self._new_session(None, None)
+                self._insert(db, session_id, session)
+        return session
+
+
+
+    def create(self, session_id: str, resume_text: Optional[str], job_description_text: Optional[str]) -> Dict[str, Any]:
+        session = self._new_session(resume_text, job_description_text)
+        with self._transaction() as db:
+            self._delete(db, session_id)
+            self._insert(db, session_id, session)
+        return session
+
+
+
+    def append_message(self, session_id: str, role: str, content: str) -> None:
+        now = time.time()
+        with self._transaction() as db:
+            updated = db.execute(
+                "UPDATE sessions SET last_access = ? WHERE session_id = ? AND last_access >= ?",
+                (now, session_id, now - self.idle_ttl_seconds)
+            ).rowcount
+            if not updated:
+                self._delete(db, session_id)
+                self._insert(db, session_id, self._new_session(None, None))
+
+            db.execute(
+                "INSERT INTO messages (session_id, role, content) VALUES (?, ?, ?)",
+                (session_id, role, content)
+            )
+            db.execute(
+                "DELETE FROM messages WHERE session_id = ? AND id NOT IN "
+                "(SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?)",
+                (session_id, session_id, self.max_messages_per_session)
+            )
+
+
+
+    def delete(self, session_id: str) -> bool:
+        with self._transaction() as db:
+            return self._delete(db, session_id)
+
+
+
+    def set_summary(self, session_id: str, summary: str, fingerprint: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE sessions SET summary = ?, summary_fingerprint = ? WHERE session_id = ?",
+                (summary, fingerprint, session_id)
+            )
+
+
+
+    def sweep(self) -> int:
+        cutoff = time.time() - self.idle_ttl_seconds
+        with self._transaction() as db:
+            db.execute(
+                "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE last_access < ?)",
+                (cutoff,)
+            )
+            removed = db.execute("DELETE FROM sessions WHERE last_access < ?", (cutoff,)).rowcount
+            self._record_evictions("ttl", removed)
+
+            # Byte cap: drop least recently used sessions until the stored text fits
+            while self._totals(db)[1] > self.max_bytes:
+                row = db.execute("SELECT session_id FROM sessions ORDER BY last_access LIMIT 1").fetchone()
+                if row is None:
+                    break
+                self._delete(db, row[0])
+                self._record_evictions("bytes")
+                removed += 1
+        return removed
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        sessions, total_bytes = self._totals(self._connection())
+        with self._stats_lock:
+            hits, misses, evictions = self.hits, self.misses, dict(self.evictions)
+        lookups = hits + misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": sessions,
+            "bytes": total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "max_messages_per_session": self.max_messages_per_session,
+            "busy_timeout_ms": self.busy_timeout_ms,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": evictions
+        }
+
+
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for db in connections:
+            db.close()
+
+
+
+    def _record_lookup(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+
+    def _record_evictions(self, reason: str, count: int = 1) -> None:
+        with self._stats_lock:
+            self.evictions[reason] += count
+
+
+
+    def _read(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._read_transaction() as db:
+            session = self._load(db, session_id, now)
+        if session is not None:
+            # A single short write after the snapshot; expired rows are left for the sweeper
+            self._connection().execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+        return session
+
+
+
+    def _load(self, db: sqlite3.Connection, session_id: str, now: float) -> Optional[Dict[str, Any]]:
+        row = db.execute(
+            "SELECT resume_text, job_description_text, created_at, last_access, summary, summary_fingerprint "
+            "FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None or now - row[3] > self.idle_ttl_seconds:
+            return None
+
+        messages = db.execute(
+            "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id", (session_id,)
+        ).fetchall()
+        return {
+            "messages": [{"role": role, "content": content} for role, content in messages],
+            "resume_text": row[0],
+            "job_description_text": row[1],
+            "created_at": row[2],
+            "summary": row[4],
+            "summary_fingerprint": row[5]
+        }
+
+
+
+    def _insert(self, db: sqlite3.Connection, session_id: str, session: Dict[str, Any]) -> None:
+        db.execute(
+            "INSERT INTO sessions (session_id, resume_text, job_description_text, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (session_id, session["resume_text"], session["job_description_text"], session["created_at"], time.time())
+        )
+        overflow = self._totals(db)[0] - self.max_sessions
+        if overflow > 0:
+            oldest = db.execute(
+                "SELECT session_id FROM sessions WHERE session_id != ? ORDER BY last_access LIMIT ?",
+                (session_id, overflow)
+            ).fetchall()
+            for (oldest_id,) in oldest:
+                self._delete(db, oldest_id)
+                self._record_evictions("lru")
+
+
+
+    def _delete(self, db: sqlite3.Connection, session_id: str) -> bool:
+        db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        return db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+
+
+    def _totals(self, db: sqlite3.Connection):
+        return db.execute("SELECT sessions, bytes FROM totals WHERE id = 0").fetchone()
+
+
+
+class _Transaction:
+    # "BEGIN IMMEDIATE" takes the write lock up front so read-then-write sequences can't deadlock
+    # on upgrade; a plain "BEGIN" only reads from one consistent snapshot
+    def __init__(self, db: sqlite3.Connection, begin: str):
+        self.db = db
+        self.begin = begin
+
+
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute(self.begin)
+        return self.db
+
+
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+
+class RedisSessionStore(SessionBackend):
+    # Works with any client exposing the redis-py command API (redis.Redis, fakeredis, ...).
+    # Idle expiry is delegated to Redis key TTLs and the byte cap to the server's maxmemory policy.
+    def __init__(self, client, key_prefix: str = "careercompass:", idle_ttl_seconds: float = 3600,
+                 max_messages_per_session: int = 200):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_messages_per_session = max_messages_per_session
+
+        self.hits = 0
+        self.misses = 0
+
+
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSessionStore":
+        import redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+
+
+    def _keys(self, session_id: str):
+        return f"{self.key_prefix}session:{session_id}", f"{self.key_prefix}messages:{session_id}"
+
+
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self._load(session_id)
+        if session is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return session
+
+
+
+    def get_or_create(self, session_id: str) -> Dict[str, Any]:
+        session = self._load(session_id)
+        if session is not None:
+            self.hits += 1
+            return session
+
+        self.misses += 1
+        session = self._new_session(None, None)
+        session_key, _ = self._keys(session_id)
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hsetnx(session_key, "created_at", session["created_at"])
+        pipeline.expire(session_key, int(self.idle_ttl_seconds))
+        pipeline.execute()
+        return session
+
+
+
+    def create(self, session_id: str, resume_text: Optional[str], job_description_text: Optional[str]) -> Dict[str, Any]:
+        session = self._new_session(resume_text, job_description_text)
+        session_key, messages_key = self._keys(session_id)
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.delete(session_key, messages_key)
+        pipeline.hset(session_key, mapping={
+            "resume_text": resume_text or "",
+            "job_description_text": job_description_text or "",
+            "created_at": session["created_at"]
+        })
+        pipeline.expire(session_key, int(self.idle_ttl_seconds))
+        pipeline.execute()
+        return session
+
+
+
+    def append_message(self, session_id: str, role: str, content: str) -> None:
+        session_key, messages_key = self._keys(session_id)
+        ttl = int(self.idle_ttl_seconds)
+        # MULTI/EXEC: push, trim to the cap and refresh both TTLs as one atomic step
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hsetnx(session_key, "created_at", datetime.now().isoformat())
+        pipeline.rpush(messages_key, json.dumps({"role": role, "content": content}))
+        pipeline.ltrim(messages_key, -self.max_messages_per_session, -1)
+        pipeline.expire(session_key, ttl)
+        pipeline.expire(messages_key, ttl)
+        pipeline.execute()
+
+
+
+    def delete(self, session_id: str) -> bool:
+        return self.client.delete(*self._keys(session_id)) > 0
+
+
+
+    def set_summary(self, session_id: str, summary: str, fingerprint: str) -> None:
+        session_key, _ = self._keys(session_id)
+        self.client.hset(session_key, mapping={"summary": summary, "summary_fingerprint": fingerprint})
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "max_messages_per_session": self.max_messages_per_session,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+
+    def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session_key, messages_key = self._keys(session_id)
+        ttl = int(self.idle_ttl_seconds)
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hgetall(session_key)
+        pipeline.lrange(messages_key, 0, -1)
+        pipeline.expire(session_key, ttl)
+        pipeline.expire(messages_key, ttl)
+        fields, raw_messages, _, _ = pipeline.execute()
+        if not fields:
+            return None
+
+        fields = {_decode(key): _decode(value) for key, value in fields.items()}
+        return {
+            "messages": [json.loads(_decode(raw)) for raw in raw_messages],
+            "resume_text": fields.get("resume_text") or None,
+            "job_description_text": fields.get("job_description_text") or None,
+            "created_at": fields.get("created_at"),
+            "summary": fields.get("summary"),
+            "summary_fingerprint": fields.get("summary_fingerprint")
+        }
+
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+
+def create_session_store() -> SessionBackend:
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    idle_ttl_seconds = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600"))
+    max_messages_per_session = int(os.getenv("SESSION_MAX_MESSAGES", "200"))
+
+    if backend == "sqlite":
+        return SqliteSessionStore(
+            path=os.getenv("SESSION_SQLITE_PATH", "data/sessions.db"),
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "100000")),
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(1024 * 1024 * 1024))),
+            idle_ttl_seconds=idle_ttl_seconds,
+            max_messages_per_session=max_messages_per_session,
+            busy_timeout_ms=int(os.getenv("SESSION_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        )
+    if backend == "redis":
+        return RedisSessionStore.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            key_prefix=os.getenv("SESSION_REDIS_PREFIX", "careercompass:"),
+            idle_ttl_seconds=idle_ttl_seconds,
+            max_messages_per_session=max_messages_per_session
+        )
+    if backend == "memory":
+        return SessionStore.from_env()
+    raise ValueError(f"Unsupported session backend: {backend}")
@@ -0,0 +1,88 @@
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import asyncio
+import hashlib
+import json
+import time
+
+from .metrics import add_request_timings, begin_request_timings, end_request_timings, record_stage
+
+
+class SingleFlight:
+    # Coalesces identical concurrent calls: the first caller for a key starts the work and
+    # later callers await the same task until it finishes. Results are not kept afterwards;
+    # the caches behind the work cover repeats that arrive later.
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.failures = 0
+
+
+
+    @staticmethod
+    def make_key(*parts: str, **options: Any) -> str:
+        hasher = hashlib.sha256()
+        for part in parts:
+            encoded = part.encode("utf-8")
+            # Length-prefixed so ("ab", "c") and ("a", "bc") never collide
+            hasher.update(len(encoded).to_bytes(8, "big"))
+            hasher.update(encoded)
+        hasher.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+        return hasher.hexdigest()
+
+
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(self._timed(fn))
+            self._in_flight[key] = task
+            self.started += 1
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+        else:
+            self.coalesced += 1
+
+        # Shielded: one caller disconnecting must not cancel the work the others are waiting on.
+        # A failure reaches every waiter as the same exception.
+        started = time.perf_counter()
+        try:
+            result, timings = await asyncio.shield(task)
+        finally:
+            if not leader:
+                record_stage("coalesced", time.perf_counter() - started)
+        # Every caller reports the shared run's stages in its own Server-Timing header
+        add_request_timings(timings)
+        return result
+
+
+
+    @staticmethod
+    async def _timed(fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, Dict[str, float]]:
+        # The task's context is its own copy, so this collects only the shared run's stages
+        token = begin_request_timings()
+        try:
+            result = await fn()
+        finally:
+            timings = end_request_timings(token)
+        return result, timings
+
+
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.started + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "coalesced_rate": round(self.coalesced / total, 4) if total else 0.0
+        }
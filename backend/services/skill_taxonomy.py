@@ -0,0 +1,139 @@
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import os
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_taxonomy.json")
+
+
+class SkillTaxonomy:
+    # The one source of skill knowledge: names, synonyms, categories and transferable-skill edges,
+    # compiled once into integer ids. Skill sets are Python ints used as bitsets, so matched /
+    # missing / extra and per-category counts are a few bitwise ops instead of nested scans.
+    def __init__(self, data: Dict[str, Any]):
+        self.category_labels: Dict[str, str] = dict(data["categories"])
+        self.skills: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.categories: List[str] = []
+        self.category_masks: Dict[str, int] = {category: 0 for category in self.category_labels}
+        self.surface_forms: Dict[str, str] = {}
+
+        for entry in data["skills"]:
+            name = entry["name"].lower()
+            category = entry["category"]
+            if name in self.ids:
+                raise ValueError(f"Duplicate skill in taxonomy: {name}")
+            if category not in self.category_labels:
+                raise ValueError(f"Unknown category '{category}' for skill {name}")
+
+            skill_id = len(self.skills)
+            self.skills.append(name)
+            self.ids[name] = skill_id
+            self.categories.append(category)
+            self.category_masks[category] |= 1 << skill_id
+
+            # Ambiguous names ("r") stay in the taxonomy for categories and edges but are never
+            # matched in free text, where they would fire on every stray letter
+            if entry.get("extract", True):
+                for surface in [name] + [synonym.lower() for synonym in entry.get("synonyms", [])]:
+                    if self.surface_forms.get(surface, name) != name:
+                        raise ValueError(f"Synonym '{surface}' maps to both {self.surface_forms[surface]} and {name}")
+                    self.surface_forms[surface] = name
+
+        # Transferable-skill edges are symmetric: knowing vue helps with react and the other way round
+        self.related_masks: List[int] = [0] * len(self.skills)
+        for entry in data["skills"]:
+            skill_id = self.ids[entry["name"].lower()]
+            for other in entry.get("related", []):
+                other_id = self.ids.get(other.lower())
+                if other_id is None:
+                    raise ValueError(f"Unknown related skill '{other}' for {entry['name']}")
+                self.related_masks[skill_id] |= 1 << other_id
+                self.related_masks[other_id] |= 1 << skill_id
+
+
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TAXONOMY_PATH) -> "SkillTaxonomy":
+        with open(path, encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+
+
+    def canonical(self, surface: str) -> Optional[str]:
+        return self.surface_forms.get(surface.lower())
+
+
+
+    def mask(self, skills: Iterable[str]) -> int:
+        # Names outside the taxonomy have no id and are left out of the bitset
+        result = 0
+        for skill in skills:
+            skill_id = self.ids.get(skill)
+            if skill_id is not None:
+                result |= 1 << skill_id
+        return result
+
+
+
+    def names(self, mask: int) -> List[str]:
+        names = []
+        while mask:
+            lowest = mask & -mask
+            names.append(self.skills[lowest.bit_length() - 1])
+            mask ^= lowest
+        return names
+
+
+
+    def has(self, mask: int, skill: str) -> bool:
+        skill_id = self.ids.get(skill)
+        return skill_id is not None and bool(mask >> skill_id & 1)
+
+
+
+    def category_of(self, skill: str) -> Optional[str]:
+        skill_id = self.ids.get(skill)
+        return self.categories[skill_id] if skill_id is not None else None
+
+
+
+    def related(self, skill: str, available: int = -1) -> List[str]:
+        skill_id = self.ids.get(skill.lower())
+        if skill_id is None:
+            return []
+        return self.names(self.related_masks[skill_id] & available)
+
+
+
+    def skills_by_category(self) -> Dict[str, List[str]]:
+        return {category: self.names(mask) for category, mask in self.category_masks.items()}
+
+
+
+    def category_breakdown(self, resume_mask: int, jd_mask: int) -> List[Dict[str, Any]]:
+        breakdown = []
+        for category, category_mask in self.category_masks.items():
+            required = (jd_mask & category_mask).bit_count()
+            if required:
+                matched = (resume_mask & jd_mask & category_mask).bit_count()
+                breakdown.append({
+                    "category": self.category_labels[category],
+                    "matched": matched,
+                    "required": required,
+                    "percentage": round(matched / required * 100, 1)
+                })
+        return breakdown
+
+
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "skills": len(self.skills),
+            "surface_forms": len(self.surface_forms),
+            "categories": len(self.category_labels),
+            "edges": sum(mask.bit_count() for mask in self.related_masks) // 2
+        }
+
+
+
+SKILL_TAXONOMY = SkillTaxonomy.load(os.getenv("SKILL_TAXONOMY_PATH") or DEFAULT_TAXONOMY_PATH)
@@ -0,0 +1,189 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import argparse
+import json
+import os
+import threading
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "tfidf.joblib")
+
+
+class TfidfModel:
+    def __init__(self, mode: str = "fitted", model_path: Optional[str] = DEFAULT_MODEL_PATH, n_features: int = 2 ** 18):
+        if mode not in ("fitted", "hashing"):
+            raise ValueError(f"Unsupported TF-IDF mode: {mode}")
+
+        self.mode = mode
+        self.model_path = model_path
+        self.n_features = n_features
+        self.kind = None
+        self.loaded_from = None
+        self._vectorizer = None
+        self._transformer = None
+        self._lock = threading.Lock()
+
+
+
+    @classmethod
+    def from_env(cls) -> "TfidfModel":
+        return cls(
+            mode=os.getenv("TFIDF_MODE", "fitted"),
+            model_path=os.getenv("TFIDF_MODEL_PATH", DEFAULT_MODEL_PATH),
+            n_features=int(os.getenv("TFIDF_HASHING_FEATURES", str(2 ** 18)))
+        )
+
+
+
+    def _ensure_loaded(self) -> None:
+        if self._vectorizer is not None:
+            return
+
+        with self._lock:
+            if self._vectorizer is not None:
+                return
+
+            if self.mode == "fitted" and self.model_path and os.path.exists(self.model_path):
+                import joblib
+                artifact = joblib.load(self.model_path)
+                self.kind = artifact["kind"]
+                self._transformer = artifact.get("transformer")
+                self._vectorizer = artifact["vectorizer"]
+                self.loaded_from = self.model_path
+                return
+
+            if self.mode == "fitted":
+                # No corpus model: keep the original scoring, a vectorizer fitted on each request's own
+                # documents, so default deployments score exactly as before until a model is fitted
+                print(f"Warning: No fitted TF-IDF model at {self.model_path}, fitting TF-IDF per request")
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                self.kind = "per_request"
+                self._vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
+                return
+
+            # Stateless: no vocabulary held in memory, safe to share across threads
+            self.kind = "hashing"
+            self._vectorizer = _hashing_vectorizer(self.n_features)
+
+
+
+    def load(self) -> None:
+        self._ensure_loaded()
+
+
+
+    def transform(self, texts: List[str]):
+        self._ensure_loaded()
+        if self.kind == "per_request":
+            # The shared instance is only a template; each call fits its own clone, so threads never share state
+            from sklearn.base import clone
+            return clone(self._vectorizer).fit_transform(texts)
+        matrix = self._vectorizer.transform(texts)
+        if self._transformer is not None:
+            matrix = self._transformer.transform(matrix)
+        return matrix
+
+
+
+    def similarities(self, query_text: str, texts: List[str]) -> np.ndarray:
+        self._ensure_loaded()
+        if self.kind == "per_request":
+            # The vocabulary and IDF come from the documents being fitted, so each pair gets its own
+            # fit: a batch of JDs then scores every JD exactly as a single /api/analyze call would
+            return np.array([self._pair_similarity(query_text, text) for text in texts], dtype=float)
+
+        # Rows come out L2-normalised, so cosine similarity is a single sparse product
+        matrix = self.transform([query_text] + list(texts))
+        return np.asarray((matrix[1:] @ matrix[0].T).todense()).ravel()
+
+
+
+    def _pair_similarity(self, query_text: str, text: str) -> float:
+        try:
+            matrix = self.transform([query_text, text])
+        except ValueError:
+            # Nothing but stop words in the pair: no vocabulary to fit, scored as no overlap
+            return 0.0
+        return float((matrix[1] @ matrix[0].T).toarray()[0, 0])
+
+
+
+    def info(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {
+            "mode": self.mode,
+            "kind": self.kind,
+            "loaded_from": self.loaded_from,
+            "idf_weighted": self.kind in ("vocabulary", "per_request") or self._transformer is not None
+        }
+
+
+
+def _hashing_vectorizer(n_features: int):
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(n_features=n_features, stop_words='english', alternate_sign=False, norm='l2')
+
+
+
+def fit_model(corpus: Iterable[str], kind: str = "vocabulary", max_features: int = 20000, n_features: int = 2 ** 18) -> Dict[str, Any]:
+    documents = list(corpus)
+    if not documents:
+        raise ValueError("Cannot fit a TF-IDF model on an empty corpus")
+
+    if kind == "vocabulary":
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer(max_features=max_features, stop_words='english', sublinear_tf=True, min_df=2)
+        vectorizer.fit(documents)
+        return {"kind": kind, "vectorizer": vectorizer}
+
+    if kind == "hashing":
+        from sklearn.feature_extraction.text import TfidfTransformer
+        vectorizer = _hashing_vectorizer(n_features)
+        transformer = TfidfTransformer(sublinear_tf=True)
+        transformer.fit(vectorizer.transform(documents))
+        return {"kind": kind, "vectorizer": vectorizer, "transformer": transformer}
+
+    raise ValueError(f"Unsupported TF-IDF model kind: {kind}")
+
+
+
+def iter_corpus(paths: List[str]) -> Iterator[str]:
+    # Accepts .txt files (one document each), .jsonl files (a "text" field per line) and directories of either
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                yield from iter_corpus(sorted(os.path.join(root, name) for name in files))
+        elif path.endswith(".jsonl"):
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)["text"]
+        elif path.endswith(".txt"):
+            with open(path, encoding="utf-8", errors="ignore") as handle:
+                yield handle.read()
+
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fit the corpus-level TF-IDF model used for match scoring")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = subparsers.add_parser("fit", help="Fit a model on a resume/JD corpus and write it to disk")
+    fit_parser.add_argument("corpus", nargs="+", help=".txt files, .jsonl files or directories")
+    fit_parser.add_argument("--output", default=DEFAULT_MODEL_PATH)
+    fit_parser.add_argument("--kind", choices=["vocabulary", "hashing"], default="vocabulary")
+    fit_parser.add_argument("--max-features", type=int, default=20000)
+    fit_parser.add_argument("--n-features", type=int, default=2 ** 18)
+
+    args = parser.parse_args(argv)
+
+    import joblib
+    artifact = fit_model(iter_corpus(args.corpus), kind=args.kind, max_features=args.max_features, n_features=args.n_features)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    joblib.dump(artifact, args.output)
+    print(f"Wrote {args.kind} TF-IDF model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
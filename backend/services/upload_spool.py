@@ -0,0 +1,84 @@
+from typing import Optional
+import asyncio
+import hashlib
+import tempfile
+import os
+
+from .document_parser import DocumentTooLargeError, MAX_DOCUMENT_BYTES
+
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+
+class SpooledUpload:
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+
+
+    def close(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+
+
+# Multipart framing (boundaries, part headers, other form fields) on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def declared_size_exceeds(content_length: Optional[str], max_bytes: int) -> bool:
+    # Checked before the body is read: a declared Content-Length over the limit is rejected without
+    # receiving it. Chunked requests declare nothing and are caught while spooling instead.
+    return bool(content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES)
+
+
+
+async def spool_upload(file, max_bytes: int = MAX_DOCUMENT_BYTES, chunk_size: int = UPLOAD_CHUNK_BYTES,
+                       spool_dir: Optional[str] = UPLOAD_SPOOL_DIR) -> SpooledUpload:
+    # By the time a handler runs, Starlette has already received the body into file.file. Known
+    # oversize files are rejected without touching it; otherwise it is copied once to a named
+    # file (parsers memory-map it and worker processes reopen it by path) on a worker thread.
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise DocumentTooLargeError(f"File is larger than the {max_bytes / (1024 * 1024):g} MB limit")
+    return await asyncio.to_thread(_spool_file, file.file, file.filename or "", max_bytes, chunk_size, spool_dir)
+
+
+
+def _spool_file(source, filename: str, max_bytes: int, chunk_size: int, spool_dir: Optional[str]) -> SpooledUpload:
+    suffix = os.path.splitext(filename)[1].lower()
+    handle = tempfile.NamedTemporaryFile(prefix="upload-", suffix=suffix, dir=spool_dir, delete=False)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with handle:
+            source.seek(0)
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DocumentTooLargeError(f"File is larger than the {max_bytes / (1024 * 1024):g} MB limit")
+                hasher.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+
+    return SpooledUpload(handle.name, filename, size, hasher.hexdigest())
@@ -0,0 +1,85 @@
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+
+
+class PoolSaturatedError(RuntimeError):
+    pass
+
+
+def process_pool_context():
+    # Workers must not be forked from the server: a fork copies the event loop, executor
+    # management threads and any lock held at that instant into a child that can never release it
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class WorkerPool:
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_queue: int = 32):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported worker pool kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+            if kind == "thread"
+            else ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context())
+        )
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+
+
+    @classmethod
+    def from_env(cls) -> "WorkerPool":
+        return cls(
+            kind=os.getenv("ANALYSIS_POOL_KIND", "thread"),
+            max_workers=int(os.getenv("ANALYSIS_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            max_queue=int(os.getenv("ANALYSIS_POOL_QUEUE", "32"))
+        )
+
+
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        # Bounded admission: jobs beyond the running workers plus the queue are rejected
+        # immediately instead of piling up unbounded work behind the executor.
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise PoolSaturatedError("Analysis worker pool is saturated, please retry shortly")
+
+        call = functools.partial(fn, *args, **kwargs)
+        if self.kind == "thread":
+            # Carry request-scoped context variables into the worker thread
+            call = functools.partial(contextvars.copy_context().run, call)
+
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.max_workers),
+            "completed": self._completed,
+            "rejected": self._rejected
+        }
+
+
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from services.chunking import DocumentChunker, best_match_means, chunk_centroids
+
+
+def section(label: str, sentences: int) -> str:
+    return " ".join(f"{label} sentence number {number} describes one responsibility." for number in range(sentences))
+
+
+class DocumentChunkerTest(unittest.TestCase):
+    def test_windows_respect_max_chars(self):
+        chunker = DocumentChunker(max_chars=80)
+        text = section("Experience", 10) + " " + "x" * 300
+        chunks = chunker.chunk(text)
+        self.assertTrue(all(len(chunk) <= 80 for chunk in chunks))
+        self.assertGreater(len(chunks), 5)
+
+    def test_bullets_and_sections_start_new_windows(self):
+        chunker = DocumentChunker(max_chars=400)
+        chunks = chunker.chunk("Skills\n- Python\n- Docker\n\nEducation\nBSc Computer Science")
+        self.assertEqual(chunks, ["Skills - Python - Docker", "Education BSc Computer Science"])
+
+    def test_repeated_windows_are_dropped(self):
+        chunker = DocumentChunker()
+        self.assertEqual(chunker.chunk("Python developer\n\npython DEVELOPER\n\nGo developer"),
+                         ["Python developer", "Go developer"])
+
+    def test_chunk_cap_keeps_every_section_and_spreads_the_rest(self):
+        chunker = DocumentChunker(max_chars=60, max_chunks=8)
+        text = "\n\n".join([section("Summary", 1), section("Experience", 20), section("Education", 2)])
+        chunks = chunker.chunk(text)
+
+        self.assertEqual(len(chunks), 8)
+        self.assertTrue(chunks[0].startswith("Summary"))
+        self.assertTrue(chunks[-1].startswith("Education"))
+        experience = [chunk for chunk in chunks if chunk.startswith("Experience")]
+        # Evenly spaced across the long section, not just its opening windows
+        self.assertIn("number 0 ", experience[0])
+        self.assertIn("number 19 ", experience[-1])
+
+    def test_more_sections_than_slots(self):
+        chunker = DocumentChunker(max_chunks=4)
+        chunks = chunker.chunk("\n\n".join(f"Section {number}" for number in range(10)))
+        self.assertEqual(chunks, ["Section 0", "Section 3", "Section 6", "Section 9"])
+
+    def test_input_is_capped_before_splitting(self):
+        chunker = DocumentChunker(max_chars=50, max_chunks=1000, max_input_chars=500)
+        chunks = chunker.chunk(section("Experience", 200))
+        self.assertLessEqual(sum(len(chunk) for chunk in chunks), 500)
+
+    def test_blank_text_still_yields_one_chunk(self):
+        self.assertEqual(DocumentChunker().chunk("   \n\n "), [""])
+
+
+class AggregationTest(unittest.TestCase):
+    def test_best_match_means_score_each_jd_by_its_own_chunks(self):
+        resume = np.array([[1, 0, 0], [0, 1, 0]], dtype=np.float32)
+        jds = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+        scores = best_match_means(resume, jds, [2, 1])
+        np.testing.assert_allclose(scores, [1.0, 0.0])
+        self.assertEqual(best_match_means(resume, np.zeros((0, 3)), []).shape, (0,))
+
+    def test_chunk_centroids_are_unit_vectors_per_document(self):
+        vectors = np.array([[2, 0], [0, 3], [0, 5]], dtype=np.float32)
+        centroids = chunk_centroids(vectors, [2, 1])
+        np.testing.assert_allclose(centroids, [[2 ** -0.5, 2 ** -0.5], [0, 1]], rtol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
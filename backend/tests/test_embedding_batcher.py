@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from services.embedding_batcher import EmbeddingBatcher
+
+
+def fake_encode(texts):
+    return np.array([[len(text), index] for index, text in enumerate(texts)], dtype=np.float32)
+
+
+class EmbeddingBatcherTest(unittest.TestCase):
+    def make_batcher(self, encode_fn=fake_encode, **kwargs):
+        batcher = EmbeddingBatcher(encode_fn, **kwargs)
+        self.addCleanup(batcher.close)
+        return batcher
+
+    def test_concurrent_callers_get_their_own_rows(self):
+        batcher = self.make_batcher(max_wait_ms=50)
+        results = {}
+
+        def call(name, texts):
+            results[name] = batcher.encode(texts)
+
+        threads = [threading.Thread(target=call, args=(i, ["x" * i] * i)) for i in range(1, 6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i in range(1, 6):
+            self.assertEqual(results[i].shape, (i, 2))
+            self.assertTrue(np.all(results[i][:, 0] == i))
+        stats = batcher.stats()
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["items"], 15)
+
+    def test_encode_errors_reach_every_caller(self):
+        def failing(texts):
+            raise ValueError("model failed")
+
+        batcher = self.make_batcher(failing)
+        with self.assertRaises(ValueError):
+            batcher.encode(["a"])
+
+    def test_close_fails_waiting_callers_and_rejects_new_work(self):
+        release = threading.Event()
+
+        def slow(texts):
+            release.wait(5)
+            return fake_encode(texts)
+
+        batcher = self.make_batcher(slow, max_wait_ms=0)
+        errors = []
+
+        def call():
+            try:
+                batcher.encode(["a"])
+            except Exception as e:
+                errors.append(e)
+
+        first = threading.Thread(target=call)
+        first.start()
+        time.sleep(0.05)
+        # The second caller queues behind the batch that is stuck in the model
+        second = threading.Thread(target=call)
+        second.start()
+        time.sleep(0.05)
+
+        batcher.close()
+        second.join(1)
+        self.assertFalse(second.is_alive())
+        self.assertIsInstance(errors[0], RuntimeError)
+
+        release.set()
+        first.join(1)
+        self.assertEqual(len(errors), 1)
+        with self.assertRaises(RuntimeError):
+            batcher.encode(["b"])
+
+    def test_callers_time_out(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stuck(texts):
+            release.wait(5)
+            return fake_encode(texts)
+
+        batcher = self.make_batcher(stuck, timeout_seconds=0.1)
+        with self.assertRaises(TimeoutError):
+            batcher.encode(["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+class EmbeddingCacheTest(unittest.TestCase):
+    def make_cache(self, path=None, **kwargs):
+        if path is None:
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            path = os.path.join(directory.name, "embeddings.db")
+        cache = EmbeddingCache(disk_path=path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_keys_ignore_whitespace_but_not_model(self):
+        self.assertEqual(EmbeddingCache.make_key("m", "a  b\n"), EmbeddingCache.make_key("m", "a b"))
+        self.assertNotEqual(EmbeddingCache.make_key("m", "a b"), EmbeddingCache.make_key("n", "a b"))
+
+    def test_only_unique_misses_reach_the_model(self):
+        cache = self.make_cache()
+        encoder = CountingEncoder()
+
+        first = cache.encode("m", ["aa", "bbb", "aa"], encoder)
+        second = cache.encode("m", ["bbb", "cccc"], encoder)
+
+        self.assertEqual(encoder.calls, [["aa", "bbb"], ["cccc"]])
+        self.assertEqual(first[:, 0].tolist(), [2, 3, 2])
+        self.assertEqual(second[:, 0].tolist(), [3, 4])
+
+    def test_disk_tier_is_shared_across_instances(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "embeddings.db")
+
+        writer = self.make_cache(path)
+        writer.encode("m", ["aa", "bbb"], CountingEncoder())
+        writer.close()
+
+        encoder = CountingEncoder()
+        reader = self.make_cache(path)
+        vectors = reader.encode("m", ["aa", "bbb", "cccc"], encoder)
+
+        self.assertEqual(encoder.calls, [["cccc"]])
+        self.assertEqual(vectors[:, 0].tolist(), [2, 3, 4])
+        stats = reader.stats()
+        self.assertEqual((stats["disk_hits"], stats["misses"]), (2, 1))
+
+    def test_memory_tier_is_bounded(self):
+        cache = self.make_cache(max_entries=2)
+        cache.encode("m", ["a", "bb", "ccc"], CountingEncoder())
+        self.assertEqual(cache.stats()["memory_entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from services.job_index import COMPACT_MIN_TOMBSTONES, JobIndex
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class JobIndexTest(unittest.TestCase):
+    def test_search_ranks_by_similarity_and_skips_removed_jobs(self):
+        index = JobIndex()
+        index.add("backend", "Backend", unit(1, 0, 0), ["python", "docker"])
+        index.add("frontend", "Frontend", unit(0, 1, 0), ["react"])
+        index.add("data", "Data", unit(1, 1, 0), ["python", "sql"])
+
+        results = index.search(unit(1, 0, 0), ["python"], top_k=2)
+        self.assertEqual([result["job_id"] for result in results], ["backend", "data"])
+        self.assertEqual(results[0]["matched_skills"], ["python"])
+        self.assertEqual(results[0]["missing_skills"], ["docker"])
+
+        self.assertTrue(index.remove("backend"))
+        self.assertFalse(index.remove("backend"))
+        results = index.search(unit(1, 0, 0), ["python"], top_k=2)
+        self.assertEqual([result["job_id"] for result in results], ["data", "frontend"])
+
+    def test_re_adding_an_id_replaces_it(self):
+        index = JobIndex()
+        index.add("job", "Old", unit(1, 0), ["python"])
+        index.add("job", "New", unit(0, 1), ["go"])
+
+        self.assertEqual(index.size, 1)
+        self.assertEqual(index.get("job")["title"], "New")
+        self.assertEqual(index.stats()["tombstones"], 1)
+        self.assertEqual(index.search(unit(0, 1), ["python"])[0]["title"], "New")
+
+    def test_in_memory_index_compacts_tombstones(self):
+        index = JobIndex(compact_ratio=0.5)
+        total = COMPACT_MIN_TOMBSTONES * 3
+        for number in range(total):
+            index.add(f"job-{number}", None, unit(1, number + 1), ["python"])
+        for number in range(COMPACT_MIN_TOMBSTONES * 2):
+            index.remove(f"job-{number}")
+
+        stats = index.stats()
+        self.assertLess(stats["tombstones"], COMPACT_MIN_TOMBSTONES)
+        self.assertEqual(stats["jobs"], total - COMPACT_MIN_TOMBSTONES * 2)
+        self.assertEqual(stats["pending_changes"], 0)
+        survivors = {f"job-{number}" for number in range(COMPACT_MIN_TOMBSTONES * 2, total)}
+        results = index.search(unit(1, 1), ["python"], top_k=total)
+        self.assertEqual({result["job_id"] for result in results}, survivors)
+        self.assertEqual(index.get(f"job-{total - 1}")["job_id"], f"job-{total - 1}")
+
+    def test_flush_merges_changes_across_instances(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        first = JobIndex(directory.name)
+        second = JobIndex(directory.name)
+        first.add("a", "A", unit(1, 0), ["python"])
+        second.add("b", "B", unit(0, 1), ["go"])
+        self.assertTrue(first.flush())
+        self.assertTrue(second.flush())
+        self.assertTrue(first.flush())
+
+        self.assertEqual(first.size, 2)
+        self.assertEqual(first.stats()["pending_changes"], 0)
+        self.assertTrue(first.stats()["memory_mapped"])
+
+        second.remove("a")
+        second.flush()
+        reloaded = JobIndex(directory.name)
+        self.assertIsNone(reloaded.get("a"))
+        self.assertEqual(reloaded.get("b")["title"], "B")
+
+
+if __name__ == "__main__":
+    unittest.main()
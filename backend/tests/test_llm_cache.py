@@ -0,0 +1,54 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from services.llm_cache import LLMResponseCache
+
+
+class LLMResponseCacheTest(unittest.TestCase):
+    def make_cache(self, **kwargs):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = LLMResponseCache(disk_path=os.path.join(directory.name, "llm.db"), **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_keys_depend_on_model_prompt_and_temperature(self):
+        key = LLMResponseCache.make_key("model", "prompt", 0.3)
+        self.assertEqual(key, LLMResponseCache.make_key("model", "prompt", 0.3))
+        self.assertNotEqual(key, LLMResponseCache.make_key("other", "prompt", 0.3))
+        self.assertNotEqual(key, LLMResponseCache.make_key("model", "prompt", 0.7))
+
+    def test_disk_tier_survives_memory_eviction(self):
+        cache = self.make_cache(max_entries=1)
+        cache.put("a", {"answer": 1}, upstream_latency=2.0)
+        cache.put("b", {"answer": 2})
+
+        self.assertEqual(cache.get("a"), {"answer": 1})
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["saved_upstream_seconds"], 2.0)
+
+    def test_expired_entries_miss(self):
+        cache = self.make_cache(ttl_seconds=10)
+        with mock.patch("services.llm_cache.time.time", return_value=1000.0):
+            cache.put("a", {"answer": 1})
+        with mock.patch("services.llm_cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_async_lookups_use_the_disk_tier(self):
+        cache = self.make_cache(max_entries=0)
+
+        async def round_trip():
+            await cache.aput("a", {"answer": 1})
+            return await cache.aget("a"), await cache.aget("missing")
+
+        self.assertEqual(asyncio.run(round_trip()), ({"answer": 1}, None))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,241 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from services.session_store import RedisSessionStore, SessionStore, SqliteSessionStore
+
+
+class FakeClock:
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeRedis:
+    # In-memory stand-in for the redis-py commands the session store uses, with key TTLs
+    # driven by a FakeClock so expiry is tested without sleeping
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.data = {}
+        self.expires_at = {}
+
+    def _live(self, key):
+        deadline = self.expires_at.get(key)
+        if deadline is not None and self.clock.time() >= deadline:
+            self.data.pop(key, None)
+            self.expires_at.pop(key, None)
+        return self.data.get(key)
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+    def hsetnx(self, key, field, value):
+        fields = self._live(key)
+        if fields is None:
+            fields = self.data[key] = {}
+        if field in fields:
+            return 0
+        fields[field] = value.encode("utf-8")
+        return 1
+
+    def hset(self, key, mapping):
+        fields = self._live(key)
+        if fields is None:
+            fields = self.data[key] = {}
+        for field, value in mapping.items():
+            fields[field] = value.encode("utf-8")
+        return len(mapping)
+
+    def hgetall(self, key):
+        return {field.encode("utf-8"): value for field, value in (self._live(key) or {}).items()}
+
+    def rpush(self, key, value):
+        values = self._live(key)
+        if values is None:
+            values = self.data[key] = []
+        values.append(value.encode("utf-8"))
+        return len(values)
+
+    def ltrim(self, key, start, end):
+        values = self._live(key)
+        if values is not None:
+            stop = None if end == -1 else end + 1
+            self.data[key] = values[start:stop]
+        return True
+
+    def lrange(self, key, start, end):
+        values = self._live(key) or []
+        return values[start:None if end == -1 else end + 1]
+
+    def expire(self, key, seconds):
+        if self._live(key) is None:
+            return False
+        self.expires_at[key] = self.clock.time() + seconds
+        return True
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                removed += 1
+            self.data.pop(key, None)
+            self.expires_at.pop(key, None)
+        return removed
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class SessionRoundTripMixin:
+    # Shared by every backend: save, load back, trim and expire behave the same everywhere
+    ttl_seconds = 60
+
+    def make_store(self, clock: FakeClock):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("services.session_store.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = self.make_store(self.clock)
+        self.addCleanup(self.store.close)
+
+    def test_create_append_and_load(self):
+        self.store.create("s1", "resume text", "jd text")
+        self.store.append_message("s1", "user", "hello")
+        self.store.append_message("s1", "assistant", "hi there")
+
+        session = self.store.get("s1")
+        self.assertEqual(session["resume_text"], "resume text")
+        self.assertEqual(session["job_description_text"], "jd text")
+        self.assertEqual(
+            session["messages"],
+            [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi there"}]
+        )
+
+    def test_summary_round_trip(self):
+        self.store.create("s1", None, None)
+        self.store.set_summary("s1", "- User: hello", "abc123")
+
+        session = self.store.get_or_create("s1")
+        self.assertEqual(session["summary"], "- User: hello")
+        self.assertEqual(session["summary_fingerprint"], "abc123")
+
+    def test_messages_are_trimmed_to_the_cap(self):
+        for index in range(5):
+            self.store.append_message("s1", "user", f"message {index}")
+
+        contents = [message["content"] for message in self.store.get("s1")["messages"]]
+        self.assertEqual(contents, ["message 2", "message 3", "message 4"])
+
+    def test_idle_sessions_expire(self):
+        self.store.create("s1", "resume text", None)
+        self.clock.advance(self.ttl_seconds / 2)
+        self.assertIsNotNone(self.store.get("s1"))
+
+        # Reads refresh the idle timer, so expiry counts from the last access
+        self.clock.advance(self.ttl_seconds / 2 + 1)
+        self.assertIsNotNone(self.store.get("s1"))
+        self.clock.advance(self.ttl_seconds + 1)
+        self.store.sweep()
+        self.assertIsNone(self.store.get("s1"))
+
+        fresh = self.store.get_or_create("s1")
+        self.assertEqual(fresh["messages"], [])
+        self.assertIsNone(fresh["resume_text"])
+
+    def test_delete(self):
+        self.store.create("s1", None, None)
+        self.assertTrue(self.store.delete("s1"))
+        self.assertFalse(self.store.delete("s1"))
+        self.assertIsNone(self.store.get("s1"))
+
+
+class MemorySessionStoreTest(SessionRoundTripMixin, unittest.TestCase):
+    def make_store(self, clock):
+        return SessionStore(idle_ttl_seconds=self.ttl_seconds, max_messages_per_session=3)
+
+
+class SqliteSessionStoreTest(SessionRoundTripMixin, unittest.TestCase):
+    def make_store(self, clock):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return SqliteSessionStore(os.path.join(directory.name, "sessions.db"), idle_ttl_seconds=self.ttl_seconds,
+                                  max_messages_per_session=3)
+
+    def test_totals_track_inserts_trims_and_deletes(self):
+        self.store.create("s1", "abcd", "ef")
+        for index in range(5):
+            self.store.append_message("s1", "user", "x" * 10)
+        self.store.create("s2", None, None)
+
+        stats = self.store.stats()
+        self.assertEqual(stats["sessions"], 2)
+        self.assertEqual(stats["bytes"], 6 + 3 * 10)
+
+        self.store.delete("s1")
+        stats = self.store.stats()
+        self.assertEqual(stats["sessions"], 1)
+        self.assertEqual(stats["bytes"], 0)
+
+
+    def test_close_reaches_every_thread_connection(self):
+        self.store.create("s1", None, None)
+        worker = threading.Thread(target=self.store.get, args=("s1",))
+        worker.start()
+        worker.join()
+        self.assertEqual(len(self.store._connections), 2)
+
+        self.store.close()
+        self.assertEqual(self.store._connections, [])
+        # A thread that used the store before close() reconnects instead of reusing a closed handle
+        self.assertIsNotNone(self.store.get("s1"))
+
+    def test_counters_are_exact_under_concurrency(self):
+        self.store.create("s1", None, None)
+
+        def read():
+            for _ in range(50):
+                self.store.get("s1")
+                self.store.get("missing")
+
+        workers = [threading.Thread(target=read) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        stats = self.store.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (200, 200))
+
+
+class RedisSessionStoreTest(SessionRoundTripMixin, unittest.TestCase):
+    def make_store(self, clock):
+        return RedisSessionStore(FakeRedis(clock), idle_ttl_seconds=self.ttl_seconds, max_messages_per_session=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+
+from services.metrics import begin_request_timings, end_request_timings, stage
+from services.single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_identical_calls_share_one_run(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"score": 7}
+
+        async def main():
+            return await asyncio.gather(*(flights.run("key", work) for _ in range(3)))
+
+        results = asyncio.run(main())
+        self.assertEqual(results, [{"score": 7}] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((flights.stats()["started"], flights.stats()["coalesced"]), (1, 2))
+        self.assertEqual(flights.stats()["in_flight"], 0)
+
+    def test_failures_reach_every_waiter_and_are_not_kept(self):
+        flights = SingleFlight()
+        attempts = []
+
+        async def failing():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        async def main():
+            first = await asyncio.gather(*(flights.run("key", failing) for _ in range(2)), return_exceptions=True)
+            second = await asyncio.gather(flights.run("key", failing), return_exceptions=True)
+            return first + second
+
+        errors = asyncio.run(main())
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+        # The failed run is dropped, so the retry starts fresh work
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(flights.stats()["failures"], 2)
+
+    def test_a_cancelled_waiter_does_not_cancel_the_run(self):
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def main():
+            leaver = asyncio.ensure_future(flights.run("key", work))
+            stayer = asyncio.ensure_future(flights.run("key", work))
+            await asyncio.sleep(0.01)
+            leaver.cancel()
+            return await stayer
+
+        self.assertEqual(asyncio.run(main()), "done")
+
+    def test_every_caller_gets_the_shared_stage_timings(self):
+        flights = SingleFlight()
+
+        async def work():
+            with stage("analysis"):
+                await asyncio.sleep(0.02)
+            return "done"
+
+        async def request():
+            token = begin_request_timings()
+            try:
+                await flights.run("key", work)
+            finally:
+                timings = end_request_timings(token)
+            return timings
+
+        async def main():
+            return await asyncio.gather(request(), request())
+
+        leader, waiter = asyncio.run(main())
+        self.assertEqual(set(leader), {"analysis"})
+        self.assertEqual(set(waiter), {"analysis", "coalesced"})
+        self.assertEqual(leader["analysis"], waiter["analysis"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from services.document_parser import _compile_nested_skills, _compile_skill_pattern, extract_skill_spans, extract_skills
+
+
+class ExtractSkillsTest(unittest.TestCase):
+    def test_plural_forms_map_to_the_canonical_skill(self):
+        skills = extract_skills("Built REST APIs and split the monolith into a microservice per domain")
+        self.assertIn("api", skills)
+        self.assertIn("rest", skills)
+        self.assertIn("microservices", skills)
+
+    def test_singular_and_plural_synonyms(self):
+        self.assertIn("api", extract_skills("Built REST APIs"))
+        self.assertIn("websocket", extract_skills("Realtime updates over websockets"))
+
+    def test_matches_respect_word_boundaries(self):
+        self.assertEqual(extract_skills("JavaScript and Java"), ["javascript", "java"])
+        self.assertEqual(extract_skills("javascripting in Javaland"), [])
+
+    def test_skills_ending_in_symbols(self):
+        self.assertEqual(extract_skills("C++ and C# on ASP.NET, built with Next.js"), ["c++", "c#", "asp.net", "next.js"])
+
+    def test_synonyms_report_the_canonical_name(self):
+        spans = extract_skill_spans("Ran k8s clusters with python3")
+        self.assertEqual(spans, [("kubernetes", 4, 7), ("python", 22, 29)])
+
+    def test_multi_word_skills_also_report_contained_skills(self):
+        self.assertEqual(extract_skills("CI on GitHub Actions"), ["github actions", "github"])
+
+    def test_ambiguous_names_are_not_extracted(self):
+        self.assertEqual(extract_skills("R and Go"), [])
+
+
+class TrieSkillPatternTest(unittest.TestCase):
+    def test_longest_alternative_wins(self):
+        pattern = _compile_skill_pattern(["go", "golang", "google cloud", "google"])
+        found = [match.group(0) for match in pattern.finditer("Golang on Google Cloud, not Google Docs or gopher")]
+        self.assertEqual(found, ["Golang", "Google Cloud", "Google"])
+
+    def test_backtracks_to_a_shorter_skill_at_a_word_boundary(self):
+        pattern = _compile_skill_pattern(["rest", "rest api"])
+        self.assertEqual([match.group(0) for match in pattern.finditer("REST APIs")], ["REST"])
+
+    def test_large_keyword_lists(self):
+        skills = [f"skill{number}" for number in range(5000)]
+        pattern = _compile_skill_pattern(skills)
+        found = [match.group(0) for match in pattern.finditer("skill1 skill49999 skill4999 skill 12")]
+        self.assertEqual(found, ["skill1", "skill4999"])
+
+    def test_nested_skills_are_recorded_by_offset(self):
+        nested = _compile_nested_skills(["github", "github actions", "actions", "git"])
+        self.assertEqual(nested, {"github actions": [("github", 0), ("actions", 7)]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from services.skill_taxonomy import SKILL_TAXONOMY, SkillTaxonomy
+
+
+def make_taxonomy(skills=None):
+    return SkillTaxonomy({
+        "categories": {"languages": "Programming Languages", "frontend": "Frontend"},
+        "skills": skills if skills is not None else [
+            {"name": "Python", "category": "languages", "synonyms": ["python3"], "related": ["java"]},
+            {"name": "java", "category": "languages"},
+            {"name": "r", "category": "languages", "extract": False},
+            {"name": "react", "category": "frontend", "synonyms": ["reactjs"], "related": ["vue"]},
+            {"name": "vue", "category": "frontend"}
+        ]
+    })
+
+
+class SkillTaxonomyTest(unittest.TestCase):
+    def test_masks_round_trip_and_skip_unknown_names(self):
+        taxonomy = make_taxonomy()
+        mask = taxonomy.mask(["vue", "python", "cobol"])
+
+        self.assertEqual(mask.bit_count(), 2)
+        self.assertEqual(taxonomy.names(mask), ["python", "vue"])
+        self.assertTrue(taxonomy.has(mask, "vue"))
+        self.assertFalse(taxonomy.has(mask, "java"))
+        self.assertFalse(taxonomy.has(mask, "cobol"))
+
+    def test_surface_forms_and_ambiguous_names(self):
+        taxonomy = make_taxonomy()
+        self.assertEqual(taxonomy.canonical("Python3"), "python")
+        self.assertEqual(taxonomy.canonical("reactjs"), "react")
+        # Kept for categories and edges, never matched in free text
+        self.assertIsNone(taxonomy.canonical("r"))
+        self.assertEqual(taxonomy.category_of("r"), "languages")
+
+    def test_related_edges_are_symmetric_and_filtered(self):
+        taxonomy = make_taxonomy()
+        self.assertEqual(taxonomy.related("java"), ["python"])
+        self.assertEqual(taxonomy.related("Python"), ["java"])
+        self.assertEqual(taxonomy.related("vue", available=taxonomy.mask(["java"])), [])
+        self.assertEqual(taxonomy.related("cobol"), [])
+
+    def test_category_breakdown_counts_required_skills_only(self):
+        taxonomy = make_taxonomy()
+        breakdown = taxonomy.category_breakdown(
+            taxonomy.mask(["python", "react"]),
+            taxonomy.mask(["python", "java"])
+        )
+        self.assertEqual(breakdown, [
+            {"category": "Programming Languages", "matched": 1, "required": 2, "percentage": 50.0}
+        ])
+
+    def test_invalid_taxonomies_are_rejected(self):
+        cases = {
+            "duplicate": [{"name": "go", "category": "languages"}, {"name": "Go", "category": "languages"}],
+            "unknown category": [{"name": "go", "category": "databases"}],
+            "synonym conflict": [
+                {"name": "go", "category": "languages", "synonyms": ["golang"]},
+                {"name": "golang", "category": "languages"}
+            ],
+            "unknown related": [{"name": "go", "category": "languages", "related": ["rust"]}]
+        }
+        for case, skills in cases.items():
+            with self.subTest(case=case), self.assertRaises(ValueError):
+                make_taxonomy(skills)
+
+    def test_shipped_taxonomy_loads(self):
+        stats = SKILL_TAXONOMY.stats()
+        self.assertGreater(stats["surface_forms"], stats["skills"])
+        self.assertEqual(SKILL_TAXONOMY.canonical("k8s"), "kubernetes")
+        self.assertEqual(set(SKILL_TAXONOMY.skills_by_category()), set(SKILL_TAXONOMY.category_labels))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from services.tfidf_model import TfidfModel
+
+
+RESUME = "Python developer building REST APIs with FastAPI, PostgreSQL and Docker on AWS"
+JOBS = [
+    "Backend engineer: Python, FastAPI, PostgreSQL, Docker",
+    "Frontend engineer: React, TypeScript, CSS",
+    "Data engineer: Python, Spark, Airflow, AWS",
+]
+
+
+class TfidfSimilarityTest(unittest.TestCase):
+    def test_batch_scores_match_single_pair_scores(self):
+        for mode in ("fitted", "hashing"):
+            with self.subTest(mode=mode):
+                model = TfidfModel(mode=mode, model_path=None)
+                batch = model.similarities(RESUME, JOBS)
+                singles = [model.similarities(RESUME, [job])[0] for job in JOBS]
+                self.assertEqual(list(batch), singles)
+
+    def test_stop_word_only_documents_score_zero(self):
+        model = TfidfModel(mode="fitted", model_path=None)
+        self.assertEqual(list(model.similarities("the and of", ["it is the"])), [0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from aiohttp import web
+
+# A local stand-in for OpenRouter's chat completions API, for load tests that must not hit
+# the real endpoint. Run it, then start the backend with OPENROUTER_BASE_URL=http://127.0.0.1:8081/api/v1
+
+
+class FakeOpenRouter:
+    def __init__(self, latency_ms: float = 800, jitter_ms: float = 200, error_rate: float = 0.0, error_status: int = 500,
+                 stream_chunk_delay_ms: float = 20, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stream_chunk_delay_ms = stream_chunk_delay_ms
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        # Both the bare path and the /api/v1 prefix, so either form of base URL works
+        app.router.add_post("/chat/completions", self.chat_completions)
+        app.router.add_post("/api/v1/chat/completions", self.chat_completions)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        body = await request.json()
+        messages = body.get("messages", [])
+
+        await asyncio.sleep(self._delay_seconds())
+
+        if self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response(
+                {"error": {"code": self.error_status, "message": "Simulated upstream failure"}},
+                status=self.error_status
+            )
+
+        content = self._content_for(messages)
+        usage = {
+            "prompt_tokens": sum(len(message.get("content", "")) for message in messages) // 4,
+            "completion_tokens": len(content) // 4
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if body.get("stream"):
+            return await self._stream(request, body, content, usage)
+
+        return web.json_response({
+            "id": f"fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage
+        })
+
+
+
+    async def _stream(self, request: web.Request, body: Dict[str, Any], content: str, usage: Dict[str, int]) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        await response.write(b": OPENROUTER PROCESSING\n\n")
+
+        words = content.split(" ")
+        for index, word in enumerate(words):
+            delta = word if index == len(words) - 1 else word + " "
+            chunk = {"id": f"fake-{self.requests}", "model": body.get("model", "fake"), "choices": [{"index": 0, "delta": {"content": delta}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            if self.stream_chunk_delay_ms:
+                await asyncio.sleep(self.stream_chunk_delay_ms / 1000)
+
+        final = {"id": f"fake-{self.requests}", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+        await response.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+
+    def _delay_seconds(self) -> float:
+        return max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+
+
+    def _content_for(self, messages: List[Dict[str, str]]) -> str:
+        prompt = messages[-1].get("content", "") if messages else ""
+        # Scores are derived from the prompt, so the same resume/JD pair always gets the same answer
+        score = 40 + int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:4], 16) % 55
+
+        if "fit_score" in prompt or "Respond in valid JSON" in json.dumps(messages):
+            return "```json\n" + json.dumps({
+                "fit_score": score,
+                "fit_level": "Good" if score >= 70 else "Moderate",
+                "summary": "The candidate covers most of the core stack. A few platform skills are missing.",
+                "fit_assessment": "Reasonable fit with some gaps.",
+                "key_strengths": [{"strength": "Backend development", "evidence": "Several production services"}],
+                "critical_gaps": [{"gap": "Kubernetes", "priority": "High", "solution": "Deploy a project to a managed cluster"}],
+                "learning_path": [{"step": 1, "skill": "Kubernetes", "timeline": "4 weeks"}],
+                "quick_wins": ["Quantify impact in recent roles"],
+                "readiness_percentage": score,
+                "next_steps": ["Tailor the resume summary to the role"],
+                "strengths": ["Backend development"],
+                "improvements": ["Container orchestration"],
+                "actionable_tip": "Lead with the most relevant project."
+            }) + "\n```"
+
+        excerpt = " ".join(prompt.split()[:12])
+        return (
+            f"Thanks for the question about \"{excerpt}\". Focus on the two or three skills the role lists first, "
+            "build one small project that shows them end to end, and describe its impact with numbers on your resume."
+        )
+
+
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "errors": self.errors})
+
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local fake OpenRouter chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=800, help="Mean time before the first byte")
+    parser.add_argument("--jitter-ms", type=float, default=200, help="Uniform +/- jitter around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail, 0 to 1")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status for simulated failures, e.g. 429")
+    parser.add_argument("--stream-chunk-delay-ms", type=float, default=20, help="Delay between streamed tokens")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = FakeOpenRouter(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        stream_chunk_delay_ms=args.stream_chunk_delay_ms,
+        seed=args.seed
+    )
+    web.run_app(server.build_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+import aiohttp
+
+from benchmarks.fixtures import make_resume, make_job_description
+
+# Drives the API at a fixed concurrency (closed loop) or a target request rate (open loop)
+# and reports throughput and latency percentiles per scenario. Pair it with
+# tools/fake_openrouter.py so runs are cheap and reproducible.
+
+SCENARIOS = ("analyze", "chat", "upload")
+
+
+class LoadTest:
+    def __init__(self, base_url: str, scenarios: List[str], unique_inputs: bool = False, bypass_cache: bool = False,
+                 timeout_seconds: float = 120):
+        self.base_url = base_url.rstrip("/")
+        self.scenarios = scenarios
+        self.unique_inputs = unique_inputs
+        self.bypass_cache = bypass_cache
+        self.timeout_seconds = timeout_seconds
+
+        self.resume_text = make_resume(pages=2, skills=30)
+        self.job_description_text = make_job_description(skills=20)
+        self._sequence = itertools.count()
+        self._chat_sessions: List[str] = []
+
+        self.latencies: Dict[str, List[float]] = {name: [] for name in scenarios}
+        self.statuses: Dict[str, Dict[str, int]] = {name: {} for name in scenarios}
+        self.dropped = 0
+
+
+
+    def _job_description(self) -> str:
+        # Unique inputs defeat the parse, embedding and LLM caches so every request does full work
+        if self.unique_inputs:
+            return f"{self.job_description_text}\nReference: {next(self._sequence)}"
+        return self.job_description_text
+
+
+
+    async def _analyze(self, session: aiohttp.ClientSession) -> int:
+        headers = {"X-Cache-Bypass": "1"} if self.bypass_cache else {}
+        async with session.post(f"{self.base_url}/api/analyze", headers=headers, json={
+            "resume_text": self.resume_text,
+            "job_description_text": self._job_description()
+        }) as response:
+            await response.read()
+            return response.status
+
+
+
+    async def _chat(self, session: aiohttp.ClientSession) -> int:
+        session_id = self._chat_sessions[next(self._sequence) % len(self._chat_sessions)]
+        async with session.post(f"{self.base_url}/api/chat", json={
+            "session_id": session_id,
+            "message": "Which of my skills should I highlight for this role?"
+        }) as response:
+            await response.read()
+            return response.status
+
+
+
+    async def _upload(self, session: aiohttp.ClientSession) -> int:
+        form = aiohttp.FormData()
+        content = self.resume_text + (f"\nReference: {next(self._sequence)}" if self.unique_inputs else "")
+        form.add_field("file", content.encode("utf-8"), filename="resume.txt", content_type="text/plain")
+        async with session.post(f"{self.base_url}/api/upload-resume", data=form) as response:
+            await response.read()
+            return response.status
+
+
+
+    async def _prepare(self, session: aiohttp.ClientSession, sessions_needed: int) -> None:
+        if "chat" not in self.scenarios:
+            return
+        for _ in range(sessions_needed):
+            async with session.post(f"{self.base_url}/api/session/create", data={
+                "resume_text": self.resume_text,
+                "job_description_text": self.job_description_text
+            }) as response:
+                response.raise_for_status()
+                self._chat_sessions.append((await response.json())["session_id"])
+
+
+
+    async def _issue(self, session: aiohttp.ClientSession, scenario: str) -> None:
+        handler: Callable[[aiohttp.ClientSession], Awaitable[int]] = getattr(self, f"_{scenario}")
+        started = time.perf_counter()
+        try:
+            status = str(await handler(session))
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except aiohttp.ClientError as e:
+            status = type(e).__name__
+        self.latencies[scenario].append(time.perf_counter() - started)
+        self.statuses[scenario][status] = self.statuses[scenario].get(status, 0) + 1
+
+
+
+    async def run(self, duration_seconds: float, concurrency: Optional[int] = None, rps: Optional[float] = None,
+                  max_in_flight: int = 1000) -> Dict[str, Any]:
+        connector = aiohttp.TCPConnector(limit=0)
+        timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await self._prepare(session, sessions_needed=min(concurrency or 16, 64))
+            mix = itertools.cycle(self.scenarios)
+            started = time.perf_counter()
+            deadline = started + duration_seconds
+
+            if rps:
+                # Open loop: requests start on schedule whether or not earlier ones finished,
+                # which exposes queueing the way real traffic does
+                in_flight = set()
+                interval = 1.0 / rps
+                next_start = started
+                while next_start < deadline:
+                    await asyncio.sleep(max(0.0, next_start - time.perf_counter()))
+                    if len(in_flight) < max_in_flight:
+                        task = asyncio.create_task(self._issue(session, next(mix)))
+                        in_flight.add(task)
+                        task.add_done_callback(in_flight.discard)
+                    else:
+                        self.dropped += 1
+                    next_start += interval
+                await asyncio.gather(*in_flight)
+            else:
+                async def worker():
+                    while time.perf_counter() < deadline:
+                        await self._issue(session, next(mix))
+
+                await asyncio.gather(*(worker() for _ in range(concurrency or 1)))
+
+            elapsed = time.perf_counter() - started
+
+        return self.report(elapsed, concurrency=concurrency, rps=rps)
+
+
+
+    def report(self, elapsed: float, concurrency: Optional[int], rps: Optional[float]) -> Dict[str, Any]:
+        scenarios = {}
+        for name in self.scenarios:
+            latencies = sorted(self.latencies[name])
+            ok = sum(count for status, count in self.statuses[name].items() if status.startswith("2"))
+            scenarios[name] = {
+                "requests": len(latencies),
+                "ok": ok,
+                "statuses": self.statuses[name],
+                "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": _percentile_ms(latencies, 50),
+                "p90_ms": _percentile_ms(latencies, 90),
+                "p95_ms": _percentile_ms(latencies, 95),
+                "p99_ms": _percentile_ms(latencies, 99),
+                "max_ms": round(latencies[-1] * 1000, 1) if latencies else None
+            }
+        return {
+            "mode": "rps" if rps else "concurrency",
+            "target_rps": rps,
+            "concurrency": concurrency,
+            "duration_seconds": round(elapsed, 2),
+            "dropped": self.dropped,
+            "scenarios": scenarios
+        }
+
+
+
+def _percentile_ms(sorted_values: List[float], percentile: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round((len(sorted_values) - 1) * percentile / 100)))
+    return round(sorted_values[index] * 1000, 1)
+
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Concurrent load generator for the Career Compass API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", default="analyze", help=f"Comma-separated mix of {', '.join(SCENARIOS)}")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to generate load for")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, help="Closed loop: this many requests always in flight")
+    mode.add_argument("--rps", type=float, help="Open loop: start this many requests per second")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Open loop safety cap; extra starts are dropped")
+    parser.add_argument("--unique", action="store_true", help="Vary inputs per request so caches do not absorb the load")
+    parser.add_argument("--bypass-cache", action="store_true", help="Send X-Cache-Bypass on analyze requests")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    scenarios = [name.strip() for name in args.scenario.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    load_test = LoadTest(args.base_url, scenarios, unique_inputs=args.unique, bypass_cache=args.bypass_cache, timeout_seconds=args.timeout)
+    report = asyncio.run(load_test.run(
+        args.duration,
+        concurrency=None if args.rps else (args.concurrency or 10),
+        rps=args.rps,
+        max_in_flight=args.max_in_flight
+    ))
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()